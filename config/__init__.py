@@ -1,5 +1,5 @@
 """Configuration module initialization"""
 
-from .settings import Settings, settings
+from .settings import Settings, settings, get_settings
 
-__all__ = ["Settings", "settings"]
+__all__ = ["Settings", "settings", "get_settings"]
@@ -5,10 +5,91 @@ Centralized configuration management using Pydantic Settings
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional
 import os
 from pathlib import Path
 
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Hotel catalog - built once at import and shared read-only (not Settings fields,
+# so constructing Settings never copies or validates them)
+# Room Types and Pricing (can be moved to database)
+ROOM_TYPES: Mapping[str, Mapping[str, Any]] = _freeze({
+    "single": {
+        "name": "Single Room",
+        "price": 1500,
+        "capacity": 1,
+        "amenities": ["WiFi", "TV", "AC"]
+    },
+    "double": {
+        "name": "Double Room",
+        "price": 2500,
+        "capacity": 2,
+        "amenities": ["WiFi", "TV", "AC", "Mini Bar"]
+    },
+    "deluxe": {
+        "name": "Deluxe Room",
+        "price": 3500,
+        "capacity": 2,
+        "amenities": ["WiFi", "Smart TV", "AC", "Mini Bar", "Balcony"]
+    },
+    "suite": {
+        "name": "Executive Suite",
+        "price": 5500,
+        "capacity": 4,
+        "amenities": ["WiFi", "Smart TV", "AC", "Mini Bar", "Balcony", "Living Room"]
+    }
+})
+
+# Dining Options
+DINING_OPTIONS: Mapping[str, Mapping[str, Any]] = _freeze({
+    "breakfast": {
+        "name": "Breakfast Buffet",
+        "price": 500,
+        "timings": "7:00 AM - 10:30 AM"
+    },
+    "lunch": {
+        "name": "Lunch Buffet",
+        "price": 800,
+        "timings": "12:00 PM - 3:00 PM"
+    },
+    "dinner": {
+        "name": "Dinner Buffet",
+        "price": 1000,
+        "timings": "7:00 PM - 11:00 PM"
+    }
+})
+
+# Party Hall Configuration
+PARTY_HALLS: Mapping[str, Mapping[str, Any]] = _freeze({
+    "small": {
+        "name": "Royal Hall",
+        "capacity": 50,
+        "price_per_hour": 5000
+    },
+    "medium": {
+        "name": "Grand Ballroom",
+        "capacity": 150,
+        "price_per_hour": 12000
+    },
+    "large": {
+        "name": "Imperial Hall",
+        "capacity": 300,
+        "price_per_hour": 20000
+    }
+})
+
+
 class Settings(BaseSettings):
     """Application configuration settings"""
     
@@ -39,6 +120,29 @@ class Settings(BaseSettings):
         default="sqlite:///./hotel_receptionist.db",
         env="DATABASE_URL"
     )
+    # Async pool per worker (PostgreSQL) - size to one worker's concurrent requests.
+    # Every worker has its own pool, so workers x (size + overflow) must stay
+    # below the server's max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_WARMUP: int = 2  # connections each worker opens at startup
+    DB_STATEMENT_CACHE_SIZE: int = 256  # prepared statements kept per asyncpg connection
+    
+    # Cache Configuration (leave REDIS_URL unset to use in-process caches)
+    REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
+    CHAT_CACHE_TTL: int = 300
+    AVAILABILITY_CACHE_TTL: int = 30
+    
+    # Conversation sessions (stored in Redis when REDIS_URL is set)
+    SESSION_TTL: int = 86400
+    MAX_SESSIONS: int = 10000  # in-process store only; least recently used sessions are evicted
+    
+    # NLU micro-batching (concurrent chat requests are analyzed together)
+    NLU_BATCH_SIZE: int = 16
+    NLU_BATCH_WAIT_MS: int = 15
+    # AI intent fallback: messages no rule matched share one LLM call
+    AI_INTENT_BATCH_SIZE: int = 8
+    AI_INTENT_BATCH_WAIT_MS: int = 20
     
     # Security
     SECRET_KEY: str = Field(
@@ -48,10 +152,15 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # CORS - origins allowed to call the API from another site (the bundled UIs are same-origin)
+    ALLOWED_ORIGINS: List[str] = Field(default_factory=list, env="ALLOWED_ORIGINS")
+    CORS_MAX_AGE: int = 86400
+    
     # Voice Configuration
     ENABLE_VOICE: bool = True
     SPEECH_LANGUAGE: str = "en-IN"
     TTS_PROVIDER: str = "gtts"  # "gtts" or "elevenlabs"
+    TTS_CACHE_TTL: int = 86400  # synthesized replies are reused for identical text
     
     # Language Support
     SUPPORTED_LANGUAGES: list = [
@@ -66,72 +175,7 @@ class Settings(BaseSettings):
     INTENT_CONFIDENCE_THRESHOLD: float = 0.7
     ENTITY_CONFIDENCE_THRESHOLD: float = 0.6
     MAX_CONVERSATION_TURNS: int = 20
-    
-    # Room Types and Pricing (can be moved to database)
-    ROOM_TYPES: dict = {
-        "single": {
-            "name": "Single Room",
-            "price": 1500,
-            "capacity": 1,
-            "amenities": ["WiFi", "TV", "AC"]
-        },
-        "double": {
-            "name": "Double Room",
-            "price": 2500,
-            "capacity": 2,
-            "amenities": ["WiFi", "TV", "AC", "Mini Bar"]
-        },
-        "deluxe": {
-            "name": "Deluxe Room",
-            "price": 3500,
-            "capacity": 2,
-            "amenities": ["WiFi", "Smart TV", "AC", "Mini Bar", "Balcony"]
-        },
-        "suite": {
-            "name": "Executive Suite",
-            "price": 5500,
-            "capacity": 4,
-            "amenities": ["WiFi", "Smart TV", "AC", "Mini Bar", "Balcony", "Living Room"]
-        }
-    }
-    
-    # Dining Options
-    DINING_OPTIONS: dict = {
-        "breakfast": {
-            "name": "Breakfast Buffet",
-            "price": 500,
-            "timings": "7:00 AM - 10:30 AM"
-        },
-        "lunch": {
-            "name": "Lunch Buffet",
-            "price": 800,
-            "timings": "12:00 PM - 3:00 PM"
-        },
-        "dinner": {
-            "name": "Dinner Buffet",
-            "price": 1000,
-            "timings": "7:00 PM - 11:00 PM"
-        }
-    }
-    
-    # Party Hall Configuration
-    PARTY_HALLS: dict = {
-        "small": {
-            "name": "Royal Hall",
-            "capacity": 50,
-            "price_per_hour": 5000
-        },
-        "medium": {
-            "name": "Grand Ballroom",
-            "capacity": 150,
-            "price_per_hour": 12000
-        },
-        "large": {
-            "name": "Imperial Hall",
-            "capacity": 300,
-            "price_per_hour": 20000
-        }
-    }
+    MAX_HISTORY_TURNS: int = 50  # turns kept in a session's history log (full transcript is in the DB)
     
     # Business Hours
     CHECK_IN_TIME: str = "14:00"
@@ -148,16 +192,18 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
     UPLOAD_DIR: Path = BASE_DIR / "uploads"
     AUDIO_DIR: Path = BASE_DIR / "audio"
+    STATIC_DIR: Path = BASE_DIR / "backend" / "static"
     
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = True
 
-# Create settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings singleton - .env is parsed once"""
+    return Settings()
 
-# Create necessary directories
-settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-settings.AUDIO_DIR.mkdir(parents=True, exist_ok=True)
-Path("logs").mkdir(exist_ok=True)
+
+# Create settings instance
+settings = get_settings()
@@ -1,12 +1,13 @@
 """Database module initialization"""
 
-from .database import get_db, init_database, reset_database, SessionLocal
+from .database import get_db, init_database, reset_database, warm_up_pool, SessionLocal, AsyncSessionLocal
 from .models import (
     Base,
     Conversation,
     Room,
     Guest,
     Booking,
+    BookingCounter,
     DiningReservation,
     EventBooking,
     IntentLog
@@ -16,12 +17,15 @@ __all__ = [
     "get_db",
     "init_database",
     "reset_database",
+    "warm_up_pool",
     "SessionLocal",
+    "AsyncSessionLocal",
     "Base",
     "Conversation",
     "Room",
     "Guest",
     "Booking",
+    "BookingCounter",
     "DiningReservation",
     "EventBooking",
     "IntentLog"
@@ -2,56 +2,200 @@
 Database Connection and Session Management
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from typing import AsyncIterator
+import asyncio
+import orjson
 from loguru import logger
 
 from config.settings import settings
 from database.models import Base
 
-# Create database engine
-if settings.DATABASE_URL.startswith("sqlite"):
+# Async drivers used by the request path, keyed by the sync dialect name
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def _async_url(database_url: str) -> URL:
+    """Translate the configured (sync) DATABASE_URL to its async driver"""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def _json_serializer(value) -> str:
+    """orjson encoder for JSON columns (drivers expect str, orjson returns bytes)"""
+    # Non-str keys (e.g. int slot ids) were accepted by stdlib json and must keep working
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# JSON column codec shared by every engine
+JSON_CODEC = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+
+
+# Applied to every new SQLite connection: WAL lets readers run during writes,
+# synchronous=NORMAL drops the per-commit fsync (safe under WAL)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+# An in-memory database only lives as long as a connection to it, so it keeps
+# StaticPool. Two plain ":memory:" connections would each get their own empty
+# database, so the sync and async engines both open one named shared-cache database
+SQLITE_IN_MEMORY = IS_SQLITE and make_url(settings.DATABASE_URL).database in (None, "", ":memory:")
+SHARED_MEMORY_URL = "sqlite:///file:hotel_receptionist?mode=memory&cache=shared&uri=true"
+DATABASE_URL = SHARED_MEMORY_URL if SQLITE_IN_MEMORY else settings.DATABASE_URL
+
+
+# Create database engine (sync - used for schema management and scripts)
+if IS_SQLITE:
     # SQLite specific configuration
     engine = create_engine(
-        settings.DATABASE_URL,
+        DATABASE_URL,
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.DEBUG
+        poolclass=StaticPool if SQLITE_IN_MEMORY else QueuePool,
+        **({} if SQLITE_IN_MEMORY else {"pool_size": 5}),
+        echo=settings.DEBUG,
+        **JSON_CODEC
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
     # PostgreSQL or other databases
     engine = create_engine(
-        settings.DATABASE_URL,
+        DATABASE_URL,
         pool_pre_ping=True,
-        echo=settings.DEBUG
+        echo=settings.DEBUG,
+        **JSON_CODEC
     )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create SessionLocal class (like the async sessions, objects keep their loaded
+# state after commit instead of re-SELECTing on next attribute access)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Create async engine (used by the API request path)
+if IS_SQLITE:
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        poolclass=StaticPool if SQLITE_IN_MEMORY else AsyncAdaptedQueuePool,
+        **({} if SQLITE_IN_MEMORY else {"pool_size": 5}),
+        echo=settings.DEBUG,
+        **JSON_CODEC
+    )
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+else:
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        # No ping round trip on every checkout; connections are retired before
+        # server/proxy idle timeouts instead, and a dropped one invalidates the pool
+        pool_recycle=1800,
+        # asyncpg prepares every statement; keep more of them per connection
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        echo=settings.DEBUG,
+        **JSON_CODEC
+    )
+
+# Objects stay usable after commit - lazy refreshes are not possible under asyncio
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# Older schemas had a plain ix_guests_phone index and allowed several guests per
+# phone. Booking creation upserts on uq_guests_phone, so it is added at startup
+# when that is safe; merging duplicate guests is left to scripts/merge_guest_phones.py
+GUEST_PHONE_INDEX = (
+    "DROP INDEX IF EXISTS ix_guests_phone",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_guests_phone ON guests (phone)",
+)
+
+DUPLICATE_GUEST_PHONES = text(
+    "SELECT COUNT(*) FROM (SELECT phone FROM guests GROUP BY phone HAVING COUNT(*) > 1) AS duplicates"
+)
+
+
+def _ensure_unique_guest_phones(connection) -> None:
+    """Add uq_guests_phone to databases created before it existed (no-op otherwise)"""
+    if any(index["name"] == "uq_guests_phone" for index in inspect(connection).get_indexes("guests")):
+        return
+    
+    duplicates = connection.execute(DUPLICATE_GUEST_PHONES).scalar_one()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} phone number(s) belong to more than one guest, so guests.phone "
+            "cannot be made unique. Review and merge them with "
+            "`python scripts/merge_guest_phones.py` (add --apply to write), then restart."
+        )
+    
+    logger.info("Adding unique index uq_guests_phone")
+    for statement in GUEST_PHONE_INDEX:
+        connection.execute(text(statement))
 
 
 def init_database():
     """Initialize database tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection)
+            _ensure_unique_guest_phones(connection)
         logger.success("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
 
-def get_db() -> Generator[Session, None, None]:
+async def warm_up_pool():
+    """Open a few pool connections up front so the first requests don't pay connect cost"""
+    size = getattr(async_engine.pool, "size", None)
+    if size is None:
+        # NullPool/StaticPool - nothing to pre-open
+        return
+    
+    # Only a few per worker - the rest open on demand, keeping boot-time connections well
+    # under the server limit when many workers start at once
+    connections = await asyncio.gather(
+        *(async_engine.connect() for _ in range(min(settings.DB_POOL_WARMUP, size())))
+    )
+    for connection in connections:
+        await connection.close()
+    logger.info(f"Database pool warmed with {len(connections)} connections")
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
     Dependency function to get database session
-    Usage: db: Session = Depends(get_db)
+    Usage: db: AsyncSession = Depends(get_db)
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def reset_database():
@@ -3,11 +3,14 @@ Database Models
 SQLAlchemy ORM models for hotel management system
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, JSON, Index, DDL, bindparam, event, literal_column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
-import uuid
+
+from utils.ids import new_id
 
 Base = declarative_base()
 
@@ -15,7 +18,8 @@ class Conversation(Base):
     """Store conversation history for analytics and learning"""
     __tablename__ = "conversations"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Time-ordered ids; existing rows keep their uuid4 strings, so the column stays a string
+    id = Column(String(36), primary_key=True, default=new_id)
     session_id = Column(String, nullable=False, index=True)
     user_message = Column(Text, nullable=False)
     agent_response = Column(Text, nullable=False)
@@ -50,6 +54,11 @@ class Room(Base):
     # Relationships
     bookings = relationship("Booking", back_populates="room")
     
+    __table_args__ = (
+        # Candidate rooms for availability lookups, optionally filtered by type
+        Index("ix_rooms_type_avail", "room_type", "is_available"),
+    )
+    
     def __repr__(self):
         return f"<Room {self.room_number}: {self.room_type}>"
 
@@ -61,7 +70,7 @@ class Guest(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, index=True)
-    phone = Column(String(20), nullable=False, index=True)
+    phone = Column(String(20), nullable=False)
     address = Column(Text)
     id_proof_type = Column(String(50))  # passport, aadhar, driving_license
     id_proof_number = Column(String(50))
@@ -73,10 +82,20 @@ class Guest(Base):
     # Relationships
     bookings = relationship("Booking", back_populates="guest")
     
+    __table_args__ = (
+        # One guest record per phone number - bookings upsert on it (init_database
+        # adds it to older databases; scripts/merge_guest_phones.py merges duplicates)
+        Index("uq_guests_phone", "phone", unique=True),
+    )
+    
     def __repr__(self):
         return f"<Guest {self.name}: {self.phone}>"
 
 
+# Booking statuses that hold a room for their dates
+ACTIVE_BOOKING_STATUSES = ("pending", "confirmed", "checked_in")
+
+
 class Booking(Base):
     """Room bookings"""
     __tablename__ = "bookings"
@@ -108,20 +127,73 @@ class Booking(Base):
     # Additional Info
     special_requests = Column(Text)
     source = Column(String(50), default="ai_agent")  # ai_agent, website, phone, walk_in
-    conversation_id = Column(String, ForeignKey("conversations.id"))
+    conversation_id = Column(String(36), ForeignKey("conversations.id"))
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    guest = relationship("Guest", back_populates="bookings")
-    room = relationship("Room", back_populates="bookings")
+    # Loaded with one IN (...) query per result set - lazy loads don't work under
+    # AsyncSession and would cost a query per booking anyway
+    guest = relationship("Guest", back_populates="bookings", lazy="selectin")
+    room = relationship("Room", back_populates="bookings", lazy="selectin")
+    
+    __table_args__ = (
+        # Serves the per-room date-overlap check in availability queries. Partial:
+        # only bookings that hold a room are indexed, so cancelled and past stays
+        # don't grow it; status is included so the NOT EXISTS probe never touches
+        # the table (SQLite re-checks the predicate otherwise)
+        Index(
+            "ix_bookings_active_stays",
+            "room_id", "check_in_date", "check_out_date", "status",
+            postgresql_where=status.in_(ACTIVE_BOOKING_STATUSES),
+            sqlite_where=status.in_(ACTIVE_BOOKING_STATUSES)
+        ),
+        # Arrivals/occupancy by status over a date range
+        Index("ix_bookings_status_dates", "status", "check_in_date"),
+        # PostgreSQL only: no two active stays of one room may overlap. The GiST
+        # index behind it answers range-overlap probes, and the database rejects
+        # a double booking even when two requests pass the availability check at once
+        ExcludeConstraint(
+            ("room_id", "="),
+            (func.tsrange(Column("check_in_date"), Column("check_out_date"), literal_column("'[)'")), "&&"),
+            name="ex_bookings_room_stay",
+            using="gist",
+            where="status IN ('pending', 'confirmed', 'checked_in')"
+        ).ddl_if(dialect="postgresql"),
+    )
     
     def __repr__(self):
         return f"<Booking {self.booking_reference}: {self.status}>"
 
 
+# Filter for bookings that hold a room. The statuses are inlined as literals rather
+# than bound parameters so the planner can match the partial index's WHERE clause
+ACTIVE_BOOKING = Booking.status.in_(
+    bindparam("active_statuses", ACTIVE_BOOKING_STATUSES, expanding=True, literal_execute=True)
+)
+
+
+# `room_id WITH =` inside a GiST exclusion needs the btree_gist operator classes
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+
+
+class BookingCounter(Base):
+    """Per-day sequence behind booking references (BKYYYYMMDD-NNNN)"""
+    __tablename__ = "booking_counters"
+    
+    day = Column(Date, primary_key=True)
+    last = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<BookingCounter {self.day}: {self.last}>"
+
+
 class DiningReservation(Base):
     """Restaurant/dining reservations"""
     __tablename__ = "dining_reservations"
@@ -1,14 +1,30 @@
 """Models module initialization"""
 
-from .dialogue_manager import DialogueManager, DialogueState
-from .intent_classifier import IntentClassifier
-from .entity_extractor import EntityExtractor
-from .language_detector import LanguageDetector
-
-__all__ = [
-    "DialogueManager",
-    "DialogueState",
-    "IntentClassifier",
-    "EntityExtractor",
-    "LanguageDetector"
-]
+from importlib import import_module
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# e.g. models.session_backend doesn't drag in the NLP stack as well
+_LAZY = {
+    "DialogueManager": "dialogue_manager",
+    "DialogueState": "dialogue_manager",
+    "IntentClassifier": "intent_classifier",
+    "EntityExtractor": "entity_extractor",
+    "LanguageDetector": "language_detector",
+    "InMemorySessionBackend": "session_backend",
+    "RedisSessionBackend": "session_backend",
+    "SessionState": "session_backend"
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
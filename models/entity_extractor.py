@@ -3,13 +3,49 @@ Entity Extractor
 Extracts named entities from user messages (dates, names, phone numbers, etc.)
 """
 
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 import re
 from datetime import datetime, timedelta
 from loguru import logger
+import ahocorasick
 import phonenumbers
 
 
+@lru_cache(maxsize=1024)
+def _format_indian_number(candidate: str) -> Optional[str]:
+    """
+    E.164 form of a phone number candidate parsed as Indian, or None if it isn't valid
+    
+    Memoized: parsing loads metadata and runs several regexes per call. Raises
+    NumberParseException (not cached) when the candidate can't be parsed at all.
+    """
+    parsed = phonenumbers.parse(candidate, "IN")
+    if phonenumbers.is_valid_number(parsed):
+        return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    return None
+
+
+def _build_keyword_automaton(tables: Dict[str, Dict[str, List[str]]]) -> ahocorasick.Automaton:
+    """
+    Aho-Corasick automaton over every keyword of several category -> value -> keywords tables
+
+    A match reports (category, rank, value) for each table entry listing the keyword;
+    rank is the entry's position in its table, so callers can keep table order.
+    """
+    entries: Dict[str, List[tuple]] = {}
+    for category, table in tables.items():
+        for rank, (value, keywords) in enumerate(table.items()):
+            for keyword in keywords:
+                entries.setdefault(keyword, []).append((category, rank, value))
+
+    automaton = ahocorasick.Automaton()
+    for keyword, hits in entries.items():
+        automaton.add_word(keyword, tuple(hits))
+    automaton.make_automaton()
+    return automaton
+
+
 class EntityExtractor:
     """
     Extracts entities using regex patterns and NLP
@@ -35,16 +71,57 @@ class EntityExtractor:
         ]
     }
     
-    # Temporal expressions
+    # PATTERNS compiled once at class creation
+    _PATTERN_RES = {
+        entity: [re.compile(pattern) for pattern in patterns]
+        for entity, patterns in PATTERNS.items()
+    }
+    
+    # "2 people", "for 3 guests", "5 persons" (matched against lowercased text)
+    _GUEST_COUNT_RES = [
+        re.compile(r"(\d+)\s*(people|persons?|guests?|pax)"),
+        re.compile(r"for\s+(\d+)"),
+        re.compile(r"(\d+)\s*(adult|person)"),
+    ]
+    
+    # Capitalized words after an introduction, else any two capitalized words
+    _NAME_RES = [
+        re.compile(r"(?:my name is|i am|this is|i'm)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"),
+        re.compile(r"([A-Z][a-z]+\s+[A-Z][a-z]+)"),
+    ]
+    
+    _DURATION_RES = [
+        re.compile(r"(\d+)\s*hours?"),
+        re.compile(r"for\s+(\d+)\s*hours?"),
+    ]
+    
+    # Parts of a matched date: day/month first with a 4-digit year last, or
+    # YYYY-MM-DD; both separators must be the same. The day/month/year fields
+    # accept exactly what strptime's %d, %m and %Y do.
+    _DAY_OR_MONTH = r"(3[01]|[12]\d|0[1-9]|[1-9])"
+    _DMY_RE = re.compile(_DAY_OR_MONTH + r"([-/])" + _DAY_OR_MONTH + r"\2(\d{4})")
+    _YMD_RE = re.compile(r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9])")
+    
+    _NUMBER_RE = re.compile(r"\b(\d+)\b")
+    _NON_DIGIT_RE = re.compile(r"\D")
+    _EMAIL_SHAPE_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+    
+    # Temporal expressions, each resolved against the current time
     TEMPORAL_EXPRESSIONS = {
-        "today": lambda: datetime.now(),
-        "tomorrow": lambda: datetime.now() + timedelta(days=1),
-        "day after tomorrow": lambda: datetime.now() + timedelta(days=2),
-        "next week": lambda: datetime.now() + timedelta(weeks=1),
-        "next month": lambda: datetime.now() + timedelta(days=30),
-        "this weekend": lambda: datetime.now() + timedelta(days=(5 - datetime.now().weekday())),
+        "today": lambda now: now,
+        "tomorrow": lambda now: now + timedelta(days=1),
+        "day after tomorrow": lambda now: now + timedelta(days=2),
+        "next week": lambda now: now + timedelta(weeks=1),
+        "next month": lambda now: now + timedelta(days=30),
+        "this weekend": lambda now: now + timedelta(days=(5 - now.weekday())),
     }
     
+    # All temporal expressions in one alternation; longest first so
+    # "day after tomorrow" isn't read as "tomorrow"
+    _TEMPORAL_RE = re.compile("|".join(
+        re.escape(expression) for expression in sorted(TEMPORAL_EXPRESSIONS, key=len, reverse=True)
+    ))
+    
     # Room type keywords
     ROOM_TYPES = {
         "single": ["single", "solo", "one", "1"],
@@ -63,167 +140,226 @@ class EntityExtractor:
         "large": ["large", "big", "grand", "300"]
     }
     
+    # Room type, meal and hall keywords, found in one pass over the lowercased text
+    _KEYWORD_AUTOMATON = _build_keyword_automaton({
+        "room_type": ROOM_TYPES,
+        "meal_type": {meal: [meal] for meal in MEAL_TYPES},
+        "hall_type": HALL_SIZES
+    })
+    
     def __init__(self):
         logger.info("EntityExtractor initialized")
     
-    def extract(self, text: str, language: str = "en") -> Dict[str, Any]:
+    # Every extractor extract() can run
+    ALL_FIELDS = frozenset({
+        "phone", "email", "date", "room_type", "guest_count",
+        "name", "meal_type", "hall_type", "duration"
+    })
+    
+    # Fields answered by the keyword automaton
+    _KEYWORD_FIELDS = frozenset({"room_type", "meal_type", "hall_type"})
+    
+    # Extractors worth running per classified intent (IntentClassifier names);
+    # intents not listed here get the full set
+    _INTENT_FIELDS = {
+        "greeting": frozenset({"name"}),
+        "farewell": frozenset(),
+        "room_booking": frozenset({"phone", "email", "date", "room_type", "guest_count", "name"}),
+        "room_inquiry": frozenset({"date", "room_type", "guest_count"}),
+        "dining_reservation": frozenset({"phone", "email", "date", "guest_count", "name", "meal_type"}),
+        "event_booking": frozenset({"phone", "email", "date", "guest_count", "name", "hall_type", "duration"}),
+        "booking_modification": frozenset({"phone", "email", "date", "room_type", "guest_count", "name"})
+    }
+    
+    def extract(self, text: str, language: str = "en", intent: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract all entities from text
         
         Args:
             text: Input text
             language: Language code
+            intent: Already-classified intent, if known; limits extraction to
+                the entities that intent can carry
         
         Returns:
             Dictionary of extracted entities
         """
         entities = {}
+        fields = self._INTENT_FIELDS.get(intent, self.ALL_FIELDS)
+        if not fields:
+            return entities
+        
+        # Lowercased once; helpers that match case-insensitively take this copy
+        text_lower = text.lower()
         
         # Extract phone number
-        phone = self._extract_phone(text)
+        phone = self._extract_phone(text) if "phone" in fields else None
         if phone:
             entities["phone_number"] = phone
         
         # Extract email
-        email = self._extract_email(text)
+        email = self._extract_email(text) if "email" in fields else None
         if email:
             entities["email"] = email
         
         # Extract dates
-        date = self._extract_date(text)
+        date = self._extract_date(text, text_lower) if "date" in fields else None
         if date:
             # Determine if it's check-in or reservation date based on context
-            if "check" in text.lower() or "book" in text.lower():
+            if "check" in text_lower or "book" in text_lower:
                 entities["check_in_date"] = date
-            elif "dining" in text.lower() or "dinner" in text.lower() or "lunch" in text.lower():
+            elif "dining" in text_lower or "dinner" in text_lower or "lunch" in text_lower:
                 entities["reservation_date"] = date
-            elif "event" in text.lower() or "party" in text.lower():
+            elif "event" in text_lower or "party" in text_lower:
                 entities["event_date"] = date
         
+        keywords = self._match_keywords(text_lower) if fields & self._KEYWORD_FIELDS else {}
+        
         # Extract room type
-        room_type = self._extract_room_type(text)
+        room_type = keywords.get("room_type") if "room_type" in fields else None
         if room_type:
             entities["room_type"] = room_type
         
         # Extract guest count
-        guest_count = self._extract_guest_count(text)
+        guest_count = self._extract_guest_count(text, text_lower) if "guest_count" in fields else None
         if guest_count:
             entities["guest_count"] = guest_count
         
         # Extract name (basic approach - can be enhanced)
-        name = self._extract_name(text)
+        name = self._extract_name(text) if "name" in fields else None
         if name:
             entities["guest_name"] = name
             entities["organizer_name"] = name  # Can be same for now
         
         # Extract meal type
-        meal_type = self._extract_meal_type(text)
+        meal_type = keywords.get("meal_type") if "meal_type" in fields else None
         if meal_type:
             entities["meal_type"] = meal_type
         
         # Extract hall type
-        hall_type = self._extract_hall_type(text)
+        hall_type = keywords.get("hall_type") if "hall_type" in fields else None
         if hall_type:
             entities["hall_type"] = hall_type
         
         # Extract duration (hours)
-        duration = self._extract_duration(text)
+        duration = self._extract_duration(text_lower) if "duration" in fields else None
         if duration:
             entities["duration"] = duration
         
-        logger.debug(f"Extracted entities: {entities}")
+        logger.debug("Extracted entities: {}", entities)
         return entities
     
     def _extract_phone(self, text: str) -> Optional[str]:
         """Extract phone number"""
-        for pattern in self.PATTERNS["phone_number"]:
-            match = re.search(pattern, text)
+        # Every phone pattern needs at least 10 digits
+        if sum(map(str.isdecimal, text)) < 10:
+            return None
+        
+        for pattern in self._PATTERN_RES["phone_number"]:
+            match = pattern.search(text)
             if match:
                 phone = match.group(0)
-                # Validate using phonenumbers library
+                # Validate using phonenumbers library (as an Indian number)
                 try:
-                    # Try parsing as Indian number
-                    parsed = phonenumbers.parse(phone, "IN")
-                    if phonenumbers.is_valid_number(parsed):
-                        return phonenumbers.format_number(
-                            parsed, 
-                            phonenumbers.PhoneNumberFormat.E164
-                        )
-                except:
+                    formatted = _format_indian_number(phone)
+                except phonenumbers.NumberParseException:
                     # Return as-is if parsing fails
-                    return re.sub(r'\D', '', phone)  # Keep only digits
+                    return self._NON_DIGIT_RE.sub('', phone)  # Keep only digits
+                if formatted:
+                    return formatted
         return None
     
     def _extract_email(self, text: str) -> Optional[str]:
         """Extract email address"""
-        for pattern in self.PATTERNS["email"]:
-            match = re.search(pattern, text)
+        # The email pattern backtracks over long runs of word characters; skip it when it can't match
+        if "@" not in text:
+            return None
+        
+        for pattern in self._PATTERN_RES["email"]:
+            match = pattern.search(text)
             if match:
                 return match.group(0).lower()
         return None
     
-    def _extract_date(self, text: str) -> Optional[str]:
+    def _extract_date(self, text: str, text_lower: str) -> Optional[str]:
         """Extract date from text"""
-        text_lower = text.lower()
-        
         # Check for temporal expressions first
-        for expression, date_func in self.TEMPORAL_EXPRESSIONS.items():
-            if expression in text_lower:
-                date_obj = date_func()
-                return date_obj.strftime("%Y-%m-%d")
+        match = self._TEMPORAL_RE.search(text_lower)
+        if match:
+            date_obj = self.TEMPORAL_EXPRESSIONS[match.group(0)](datetime.now())
+            return date_obj.strftime("%Y-%m-%d")
         
         # Check for explicit date patterns
-        for pattern in self.PATTERNS["date_patterns"]:
-            match = re.search(pattern, text)
+        for pattern in self._PATTERN_RES["date_patterns"]:
+            match = pattern.search(text)
             if match:
-                date_str = match.group(0)
-                # Try to parse the date
-                try:
-                    # Try different formats
-                    for fmt in ["%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%m/%d/%Y"]:
-                        try:
-                            date_obj = datetime.strptime(date_str, fmt)
-                            return date_obj.strftime("%Y-%m-%d")
-                        except:
-                            continue
-                except:
-                    pass
+                date_obj = self._parse_date(match.group(0))
+                if date_obj:
+                    return date_obj.strftime("%Y-%m-%d")
         
         return None
     
-    def _extract_room_type(self, text: str) -> Optional[str]:
-        """Extract room type"""
-        text_lower = text.lower()
-        
-        for room_type, keywords in self.ROOM_TYPES.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return room_type
+    def _parse_date(self, date_str: str) -> Optional[datetime]:
+        """
+        Parse DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD or (failing DD/MM) MM/DD/YYYY
         
+        Same formats and precedence as trying strptime with each in turn, but the
+        string is split once instead of re-parsed per format.
+        """
+        ymd = self._YMD_RE.fullmatch(date_str)
+        if ymd:
+            candidates = [(ymd.group(1), ymd.group(2), ymd.group(3))]
+        else:
+            dmy = self._DMY_RE.fullmatch(date_str)
+            if not dmy:
+                return None
+            first, separator, second, year = dmy.groups()
+            candidates = [(year, second, first)]
+            if separator == "/":
+                candidates.append((year, first, second))
+        
+        for year, month, day in candidates:
+            # %m only takes ASCII digits (%d's second digit and %Y take any)
+            if not month.isascii():
+                continue
+            try:
+                return datetime(int(year), int(month), int(day))
+            except ValueError:
+                continue
         return None
     
-    def _extract_guest_count(self, text: str) -> Optional[int]:
-        """Extract number of guests"""
-        # Look for patterns like "2 people", "for 3 guests", "5 persons"
-        patterns = [
-            r"(\d+)\s*(people|persons?|guests?|pax)",
-            r"for\s+(\d+)",
-            r"(\d+)\s*(adult|person)",
-        ]
+    def _match_keywords(self, text_lower: str) -> Dict[str, str]:
+        """
+        Room type, meal type and hall type keywords found in lowercased text
         
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
+        When several values of a category match, the one listed first in its table wins.
+        """
+        best: Dict[str, tuple] = {}
+        for _, hits in self._KEYWORD_AUTOMATON.iter(text_lower):
+            for category, rank, value in hits:
+                if category not in best or rank < best[category][0]:
+                    best[category] = (rank, value)
+        return {category: value for category, (_, value) in best.items()}
+    
+    def _extract_room_type(self, text_lower: str) -> Optional[str]:
+        """Extract room type"""
+        return self._match_keywords(text_lower).get("room_type")
+    
+    def _extract_guest_count(self, text: str, text_lower: str) -> Optional[int]:
+        """Extract number of guests"""
+        for pattern in self._GUEST_COUNT_RES:
+            match = pattern.search(text_lower)
             if match:
                 try:
                     return int(match.group(1))
-                except:
+                except ValueError:
                     pass
         
         # Look for standalone numbers in context
-        if any(word in text.lower() for word in ["guest", "people", "person"]):
-            numbers = re.findall(r'\b(\d+)\b', text)
-            if numbers:
-                return int(numbers[0])
+        if any(word in text_lower for word in ["guest", "people", "person"]):
+            number = self._NUMBER_RE.search(text)
+            if number:
+                return int(number.group(1))
         
         return None
     
@@ -232,14 +368,8 @@ class EntityExtractor:
         Extract name from text
         Basic implementation - looks for capitalized words after "my name is", "I am", etc.
         """
-        # Common name introduction patterns
-        patterns = [
-            r"(?:my name is|i am|this is|i'm)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"([A-Z][a-z]+\s+[A-Z][a-z]+)",  # Two capitalized words
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in self._NAME_RES:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 # Validate it's not a common word
@@ -248,36 +378,18 @@ class EntityExtractor:
         
         return None
     
-    def _extract_meal_type(self, text: str) -> Optional[str]:
+    def _extract_meal_type(self, text_lower: str) -> Optional[str]:
         """Extract meal type"""
-        text_lower = text.lower()
-        
-        for meal in self.MEAL_TYPES:
-            if meal in text_lower:
-                return meal
-        
-        return None
+        return self._match_keywords(text_lower).get("meal_type")
     
-    def _extract_hall_type(self, text: str) -> Optional[str]:
+    def _extract_hall_type(self, text_lower: str) -> Optional[str]:
         """Extract hall size type"""
-        text_lower = text.lower()
-        
-        for hall_type, keywords in self.HALL_SIZES.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return hall_type
-        
-        return None
+        return self._match_keywords(text_lower).get("hall_type")
     
-    def _extract_duration(self, text: str) -> Optional[int]:
+    def _extract_duration(self, text_lower: str) -> Optional[int]:
         """Extract duration in hours"""
-        patterns = [
-            r"(\d+)\s*hours?",
-            r"for\s+(\d+)\s*hours?",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
+        for pattern in self._DURATION_RES:
+            match = pattern.search(text_lower)
             if match:
                 return int(match.group(1))
         
@@ -296,19 +408,19 @@ class EntityExtractor:
         """
         if entity_type == "phone_number":
             # Check if it's 10 digits or more
-            digits = re.sub(r'\D', '', str(value))
+            digits = self._NON_DIGIT_RE.sub('', str(value))
             return len(digits) >= 10
         
         elif entity_type == "email":
             # Basic email validation
-            return re.match(r"[^@]+@[^@]+\.[^@]+", value) is not None
+            return self._EMAIL_SHAPE_RE.match(value) is not None
         
         elif entity_type in ["check_in_date", "check_out_date", "reservation_date", "event_date"]:
             # Check if date is in future
             try:
                 date_obj = datetime.strptime(value, "%Y-%m-%d")
                 return date_obj >= datetime.now()
-            except:
+            except (TypeError, ValueError):
                 return False
         
         elif entity_type == "guest_count":
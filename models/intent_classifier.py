@@ -3,13 +3,37 @@ Intent Classifier
 Uses pattern matching and AI to classify user intents
 """
 
-from typing import Dict, List, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
 import re
 from loguru import logger
 import openai
+import orjson
 from anthropic import Anthropic
 
 from config.settings import settings
+from utils.batching import MicroBatcher
+
+# Intent list shared by the single-message and batch AI prompts
+AI_INTENT_DESCRIPTIONS = """Possible intents:
+- greeting: Initial greetings
+- room_booking: Want to book a room
+- room_inquiry: Asking about room types, prices, availability
+- dining_reservation: Restaurant/dining reservations
+- event_booking: Party hall or event space booking
+- information_request: General questions about hotel
+- booking_modification: Change or cancel existing booking
+- complaint: Service complaints or issues
+- farewell: Goodbye, thanks"""
+
+# Result used whenever the AI call fails or returns something unusable
+AI_ERROR_FALLBACK = {
+    "intent": "information_request",
+    "confidence": 0.5,
+    "method": "error_fallback"
+}
 
 
 class IntentClassifier:
@@ -65,6 +89,18 @@ class IntentClassifier:
         ]
     }
     
+    # One alternation per intent, compiled once and kept in priority order. A single
+    # pattern across all intents would report the leftmost match, not the first intent.
+    # Patterns are all lowercase and run on lowercased text, so no IGNORECASE.
+    _INTENT_RES = {
+        intent: re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+        for intent, patterns in INTENT_PATTERNS.items()
+    }
+    
+    # Joins messages for classify_many. Not whitespace or a word character, so no
+    # pattern can match across it and \b behaves as at the ends of a single message.
+    _BATCH_SEPARATOR = "\x00"
+    
     def __init__(self):
         self.use_ai = settings.AI_PROVIDER in ["openai", "anthropic"]
         
@@ -80,6 +116,13 @@ class IntentClassifier:
                 self.use_ai = False
         else:
             logger.info("Intent classifier initialized with rule-based only")
+        
+        # AI fallbacks from concurrent classify_async calls share one request
+        self._ai_batcher = MicroBatcher(
+            self._classify_batch_with_ai,
+            max_batch=settings.AI_INTENT_BATCH_SIZE,
+            max_wait_ms=settings.AI_INTENT_BATCH_WAIT_MS
+        ) if self.use_ai else None
     
     def classify(self, text: str, language: str = "en") -> Dict[str, any]:
         """
@@ -92,19 +135,70 @@ class IntentClassifier:
         Returns:
             Dict with intent and confidence score
         """
-        text_lower = text.lower()
-        
         # Try rule-based classification first
-        for intent, patterns in self.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    logger.debug(f"Rule-based match: {intent}")
-                    return {
-                        "intent": intent,
-                        "confidence": 0.95,
-                        "method": "rule-based"
-                    }
+        intent = self._match_rules(text.lower())
+        if intent is not None:
+            logger.debug("Rule-based match: {}", intent)
+            return {
+                "intent": intent,
+                "confidence": 0.95,
+                "method": "rule-based"
+            }
+        
+        return self._classify_unmatched(text, language)
+    
+    async def classify_async(self, text: str, language: str = "en") -> Dict[str, any]:
+        """
+        classify for async callers
+        
+        Rule-based matches return immediately; the AI fallback is micro-batched
+        with other pending messages and runs off the event loop.
+        """
+        intent = self._match_rules(text.lower())
+        if intent is not None:
+            return {
+                "intent": intent,
+                "confidence": 0.95,
+                "method": "rule-based"
+            }
         
+        if self._ai_batcher is not None:
+            return await self._ai_batcher.submit((text, language))
+        
+        return self._classify_unmatched(text, language)
+    
+    def classify_many(self, texts: List[str], language: str = "en") -> List[Dict[str, any]]:
+        """
+        Classify several messages, same results as calling classify on each
+        
+        The rule-based pass runs each intent's pattern once over all messages
+        joined together and maps matches back to their message by offset.
+        """
+        lowered = [text.lower() for text in texts]
+        joined = self._BATCH_SEPARATOR.join(lowered)
+        # Start offset of every message within the joined text
+        starts = [0, *accumulate(len(text) + 1 for text in lowered[:-1])]
+        
+        matched: List[Optional[str]] = [None] * len(texts)
+        remaining = len(texts)
+        for intent, pattern in self._INTENT_RES.items():
+            if not remaining:
+                break
+            # Intents are visited in priority order, so the first one recorded wins
+            for match in pattern.finditer(joined):
+                index = bisect_right(starts, match.start()) - 1
+                if matched[index] is None:
+                    matched[index] = intent
+                    remaining -= 1
+        
+        return [
+            {"intent": intent, "confidence": 0.95, "method": "rule-based"}
+            if intent is not None else self._classify_unmatched(text, language)
+            for text, intent in zip(texts, matched)
+        ]
+    
+    def _classify_unmatched(self, text: str, language: str) -> Dict[str, any]:
+        """Result for a message no rule matched"""
         # Fall back to AI-based classification if available
         if self.use_ai:
             return self._classify_with_ai(text, language)
@@ -116,6 +210,15 @@ class IntentClassifier:
             "method": "fallback"
         }
     
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _match_rules(text_lower: str) -> Optional[str]:
+        """First intent whose patterns match (memoized - guests repeat short phrases a lot)"""
+        for intent, pattern in IntentClassifier._INTENT_RES.items():
+            if pattern.search(text_lower):
+                return intent
+        return None
+    
     def _classify_with_ai(self, text: str, language: str) -> Dict[str, any]:
         """Use AI to classify intent"""
         
@@ -124,61 +227,89 @@ class IntentClassifier:
 Message: "{text}"
 Language: {language}
 
-Possible intents:
-- greeting: Initial greetings
-- room_booking: Want to book a room
-- room_inquiry: Asking about room types, prices, availability
-- dining_reservation: Restaurant/dining reservations
-- event_booking: Party hall or event space booking
-- information_request: General questions about hotel
-- booking_modification: Change or cancel existing booking
-- complaint: Service complaints or issues
-- farewell: Goodbye, thanks
+{AI_INTENT_DESCRIPTIONS}
 
 Respond ONLY with a JSON object in this format:
 {{"intent": "intent_name", "confidence": 0.95}}"""
         
         try:
-            if settings.AI_PROVIDER == "openai":
-                response = self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "You are an intent classifier for a hotel receptionist AI."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=100
-                )
-                
-                content = response.choices[0].message.content
-                
-            elif settings.AI_PROVIDER == "anthropic":
-                response = self.anthropic_client.messages.create(
-                    model=settings.ANTHROPIC_MODEL,
-                    max_tokens=100,
-                    temperature=0.3,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                
-                content = response.content[0].text
-            
             # Parse JSON response
-            import json
-            result = json.loads(content.strip())
+            result = orjson.loads(self._complete(prompt, max_tokens=100).strip())
             result["method"] = "ai-based"
             
-            logger.debug(f"AI classification: {result}")
+            logger.debug("AI classification: {}", result)
             return result
             
         except Exception as e:
             logger.error(f"AI classification error: {e}")
-            return {
-                "intent": "information_request",
-                "confidence": 0.5,
-                "method": "error_fallback"
-            }
+            return dict(AI_ERROR_FALLBACK)
+    
+    def _classify_batch_with_ai(self, items: List[Tuple[str, str]]) -> List[Dict[str, any]]:
+        """Classify several (text, language) pairs with one AI request"""
+        if len(items) == 1:
+            return [self._classify_with_ai(*items[0])]
+        
+        messages = "\n".join(
+            f"{number}. [{language}] {orjson.dumps(text).decode()}"
+            for number, (text, language) in enumerate(items, start=1)
+        )
+        prompt = f"""Classify the intent of each of these hotel guest messages.
+
+Messages (number, [language], text):
+{messages}
+
+{AI_INTENT_DESCRIPTIONS}
+
+Respond ONLY with a JSON object holding one result per message, in the same order:
+{{"results": [{{"intent": "intent_name", "confidence": 0.95}}, ...]}}"""
+        
+        try:
+            results = orjson.loads(self._complete(prompt, max_tokens=60 * len(items), json_mode=True).strip())["results"]
+            if len(results) != len(items):
+                raise ValueError(f"expected {len(items)} results, got {len(results)}")
+            
+            for result in results:
+                result["method"] = "ai-based"
+            
+            logger.debug("AI batch classification: {}", results)
+            return results
+            
+        except Exception as e:
+            logger.error(f"AI batch classification error: {e}")
+            return [dict(AI_ERROR_FALLBACK) for _ in items]
+    
+    def _complete(self, prompt: str, max_tokens: int, json_mode: bool = False) -> str:
+        """
+        Send a prompt to the configured AI provider and return the reply text
+        
+        json_mode asks OpenAI for a JSON object reply (only used by the batch prompt,
+        so single-message classification keeps working on models without JSON mode)
+        """
+        if settings.AI_PROVIDER == "openai":
+            extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+            response = self.openai_client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": "You are an intent classifier for a hotel receptionist AI."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                **extra
+            )
+            
+            return response.choices[0].message.content
+        
+        response = self.anthropic_client.messages.create(
+            model=settings.ANTHROPIC_MODEL,
+            max_tokens=max_tokens,
+            temperature=0.3,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        
+        return response.content[0].text
     
     def get_all_intents(self) -> List[str]:
         """Return list of all supported intents"""
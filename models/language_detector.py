@@ -3,13 +3,39 @@ Language Detector
 Automatically detects the language of user input
 """
 
-from typing import Optional
-from langdetect import detect, LangDetectException
+from functools import lru_cache
+from typing import Dict, List, Optional
+from langdetect import detect, DetectorFactory, LangDetectException
 from loguru import logger
+import ahocorasick
+import re
 
 from config.settings import settings
 
 
+# langdetect samples randomly unless seeded; a fixed seed makes its answer stable
+DetectorFactory.seed = 0
+
+# langdetect scores n-gram profiles on every call; repeated messages reuse the
+# first answer. Failures are not cached.
+_detect_cached = lru_cache(maxsize=4096)(detect)
+
+
+def _build_indicator_automaton(indicators: Dict[str, List[str]]) -> ahocorasick.Automaton:
+    """Aho-Corasick automaton whose matches report (priority, language code)"""
+    ranked: Dict[str, tuple] = {}
+    for rank, (lang_code, phrases) in enumerate(indicators.items()):
+        for phrase in phrases:
+            # A phrase listed for several languages belongs to the first one
+            ranked.setdefault(phrase, (rank, lang_code))
+
+    automaton = ahocorasick.Automaton()
+    for phrase, entry in ranked.items():
+        automaton.add_word(phrase, entry)
+    automaton.make_automaton()
+    return automaton
+
+
 class LanguageDetector:
     """
     Detects language from user input
@@ -35,6 +61,16 @@ class LanguageDetector:
         "kn": ["ನಮಸ್ಕಾರ", "ಧನ್ಯವಾದ", "ಕೋಣೆ", "ಬುಕಿಂಗ್"],
     }
     
+    # Unicode blocks of the Indian scripts, searched in C rather than per character
+    _DEVANAGARI_RE = re.compile("[\u0900-\u097F]")
+    _TAMIL_RE = re.compile("[\u0B80-\u0BFF]")
+    _TELUGU_RE = re.compile("[\u0C00-\u0C7F]")
+    _KANNADA_RE = re.compile("[\u0C80-\u0CFF]")
+    _INDIC_RE = re.compile("[\u0900-\u097F\u0B80-\u0CFF]")
+    
+    # Every indicator phrase, matched in one pass over the text
+    _INDICATOR_AUTOMATON = _build_indicator_automaton(LANGUAGE_INDICATORS)
+    
     def __init__(self):
         logger.info("LanguageDetector initialized")
     
@@ -54,16 +90,21 @@ class LanguageDetector:
         # First try pattern-based detection (more reliable for Indian languages)
         detected_lang = self._detect_by_patterns(text)
         if detected_lang:
-            logger.debug(f"Pattern-based detection: {detected_lang}")
+            logger.debug("Pattern-based detection: {}", detected_lang)
             return detected_lang
         
+        # Every supported language other than English has its own script, which
+        # the patterns above already caught; plain ASCII can only end up as "en"
+        if text.isascii():
+            return "en"
+        
         # Fall back to langdetect library
         try:
-            lang_code = detect(text)
+            lang_code = _detect_cached(text)
             
             # Map to supported languages
             if lang_code in settings.SUPPORTED_LANGUAGES:
-                logger.debug(f"Library detection: {lang_code}")
+                logger.debug("Library detection: {}", lang_code)
                 return lang_code
             else:
                 logger.warning(f"Detected unsupported language: {lang_code}, defaulting to English")
@@ -78,13 +119,18 @@ class LanguageDetector:
         Detect language by checking for common phrases/characters
         More reliable for Indian languages
         """
-        # Check for script-specific characters
-        for lang_code, indicators in self.LANGUAGE_INDICATORS.items():
-            for indicator in indicators:
-                if indicator in text:
-                    return lang_code
+        # Indicator phrases and script ranges are all non-ASCII; isascii() is O(1)
+        if text.isascii():
+            return None
+        
+        # Check for script-specific phrases; languages listed first take priority
+        matches = [entry for _, entry in self._INDICATOR_AUTOMATON.iter(text)]
+        if matches:
+            return min(matches)[1]
         
-        # Check Unicode ranges for Indian scripts
+        # Check Unicode ranges for Indian scripts (one scan rules out all four)
+        if not self._INDIC_RE.search(text):
+            return None
         if self._contains_devanagari(text):
             return "hi"
         elif self._contains_tamil(text):
@@ -98,19 +144,19 @@ class LanguageDetector:
     
     def _contains_devanagari(self, text: str) -> bool:
         """Check if text contains Devanagari script (Hindi)"""
-        return any('\u0900' <= char <= '\u097F' for char in text)
+        return self._DEVANAGARI_RE.search(text) is not None
     
     def _contains_tamil(self, text: str) -> bool:
         """Check if text contains Tamil script"""
-        return any('\u0B80' <= char <= '\u0BFF' for char in text)
+        return self._TAMIL_RE.search(text) is not None
     
     def _contains_telugu(self, text: str) -> bool:
         """Check if text contains Telugu script"""
-        return any('\u0C00' <= char <= '\u0C7F' for char in text)
+        return self._TELUGU_RE.search(text) is not None
     
     def _contains_kannada(self, text: str) -> bool:
         """Check if text contains Kannada script"""
-        return any('\u0C80' <= char <= '\u0CFF' for char in text)
+        return self._KANNADA_RE.search(text) is not None
     
     def get_language_name(self, lang_code: str) -> str:
         """
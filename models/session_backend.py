@@ -0,0 +1,138 @@
+"""
+Session State Backends
+Where DialogueManager keeps per-session conversation state
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+import sys
+import msgpack
+from redis import asyncio as aioredis
+from redis.exceptions import WatchError
+
+# (user message, agent reply, intent, unix timestamp)
+Turn = Tuple[str, str, str, float]
+
+# Applies one change to a session (None when the session is new) and returns the new state
+SessionUpdate = Callable[[Optional["SessionState"]], "SessionState"]
+
+
+@dataclass(slots=True)
+class SessionState:
+    """
+    Per-session conversation record
+
+    `log` holds the last MAX_HISTORY_TURNS turns as JSON lines; `recent` keeps the last few
+    turns decoded as compact tuples.
+    """
+
+    language: str = "en"
+    turn_count: int = 0
+    log: bytearray = field(default_factory=bytearray)
+    recent: List[Turn] = field(default_factory=list)
+
+
+class InMemorySessionBackend:
+    """
+    Process-local session store (single worker, lost on restart)
+
+    Keeps at most `max_sessions` sessions; the least recently used one is
+    evicted when a new session would exceed that.
+    """
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self.sessions: OrderedDict[str, SessionState] = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        state = self.sessions.get(session_id)
+        if state is not None:
+            self.sessions.move_to_end(session_id)
+        return state
+
+    async def set(self, session_id: str, state: SessionState, ex: Optional[int] = None) -> None:
+        self.sessions[session_id] = state
+        self.sessions.move_to_end(session_id)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+
+    async def update(self, session_id: str, apply: SessionUpdate, ex: Optional[int] = None) -> SessionState:
+        # No await between read and write, so updates on one event loop cannot interleave
+        state = apply(self.sessions.get(session_id))
+        await self.set(session_id, state, ex=ex)
+        return state
+
+    async def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+
+class RedisSessionBackend:
+    """
+    Redis session store shared by every worker
+
+    Each session is one msgpack array under `sess:{session_id}` with a
+    sliding expiry, refreshed on every turn.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "sess"):
+        self.prefix = prefix
+        self._redis = aioredis.Redis.from_url(redis_url, decode_responses=False)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+
+    @staticmethod
+    def _decode(raw: Optional[bytes]) -> Optional[SessionState]:
+        if raw is None:
+            return None
+
+        fields = msgpack.unpackb(raw, raw=False)
+        if not isinstance(fields, list):
+            # Record written in an older layout - start the session afresh
+            return None
+
+        language, turn_count, log, recent = fields
+        # Language codes and intent names come from small fixed sets; interning
+        # makes decoded copies share the same objects as the in-code literals
+        return SessionState(
+            sys.intern(language),
+            turn_count,
+            bytearray(log),
+            [(user, agent, sys.intern(intent), timestamp) for user, agent, intent, timestamp in recent]
+        )
+
+    @staticmethod
+    def _encode(state: SessionState) -> bytes:
+        fields = [state.language, state.turn_count, bytes(state.log), state.recent]
+        return msgpack.packb(fields, use_bin_type=True)
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        return self._decode(await self._redis.get(self._key(session_id)))
+
+    async def set(self, session_id: str, state: SessionState, ex: Optional[int] = None) -> None:
+        await self._redis.set(self._key(session_id), self._encode(state), ex=ex)
+
+    async def update(self, session_id: str, apply: SessionUpdate, ex: Optional[int] = None) -> SessionState:
+        """
+        Read-modify-write one session atomically across workers
+
+        The key is WATCHed while `apply` runs; if another worker writes it
+        first the transaction is discarded and the update retried on the
+        fresh value, so concurrent turns are never lost.
+        """
+        key = self._key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    state = apply(self._decode(await pipe.get(key)))
+                    pipe.multi()
+                    pipe.set(key, self._encode(state), ex=ex)
+                    await pipe.execute()
+                    return state
+                except WatchError:
+                    continue
+
+    async def delete(self, session_id: str) -> bool:
+        return await self._redis.delete(self._key(session_id)) > 0
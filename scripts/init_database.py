@@ -6,9 +6,11 @@ Creates tables and populates with sample data
 import sys
 sys.path.append('..')
 
+from sqlalchemy import insert
+
 from database.database import init_database, SessionLocal
 from database.models import Room, Guest, Booking
-from config.settings import settings
+from config.settings import settings, ROOM_TYPES
 from loguru import logger
 from datetime import datetime, timedelta
 
@@ -29,56 +31,55 @@ def seed_rooms():
         # Create rooms for each type
         room_configs = [
             # Single rooms (101-105)
-            ("101", "single", 1, settings.ROOM_TYPES["single"]["price"]),
-            ("102", "single", 1, settings.ROOM_TYPES["single"]["price"]),
-            ("103", "single", 1, settings.ROOM_TYPES["single"]["price"]),
-            ("104", "single", 1, settings.ROOM_TYPES["single"]["price"]),
-            ("105", "single", 1, settings.ROOM_TYPES["single"]["price"]),
+            ("101", "single", 1),
+            ("102", "single", 1),
+            ("103", "single", 1),
+            ("104", "single", 1),
+            ("105", "single", 1),
             
             # Double rooms (201-210)
-            ("201", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("202", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("203", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("204", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("205", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("206", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("207", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("208", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("209", "double", 2, settings.ROOM_TYPES["double"]["price"]),
-            ("210", "double", 2, settings.ROOM_TYPES["double"]["price"]),
+            ("201", "double", 2),
+            ("202", "double", 2),
+            ("203", "double", 2),
+            ("204", "double", 2),
+            ("205", "double", 2),
+            ("206", "double", 2),
+            ("207", "double", 2),
+            ("208", "double", 2),
+            ("209", "double", 2),
+            ("210", "double", 2),
             
             # Deluxe rooms (301-308)
-            ("301", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("302", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("303", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("304", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("305", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("306", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("307", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
-            ("308", "deluxe", 3, settings.ROOM_TYPES["deluxe"]["price"]),
+            ("301", "deluxe", 3),
+            ("302", "deluxe", 3),
+            ("303", "deluxe", 3),
+            ("304", "deluxe", 3),
+            ("305", "deluxe", 3),
+            ("306", "deluxe", 3),
+            ("307", "deluxe", 3),
+            ("308", "deluxe", 3),
             
             # Suites (401-404)
-            ("401", "suite", 4, settings.ROOM_TYPES["suite"]["price"]),
-            ("402", "suite", 4, settings.ROOM_TYPES["suite"]["price"]),
-            ("403", "suite", 4, settings.ROOM_TYPES["suite"]["price"]),
-            ("404", "suite", 4, settings.ROOM_TYPES["suite"]["price"]),
+            ("401", "suite", 4),
+            ("402", "suite", 4),
+            ("403", "suite", 4),
+            ("404", "suite", 4),
         ]
         
-        for room_number, room_type, floor, price in room_configs:
-            room_info = settings.ROOM_TYPES[room_type]
-            
-            room = Room(
-                room_number=room_number,
-                room_type=room_type,
-                price_per_night=price,
-                capacity=room_info["capacity"],
-                floor=floor,
-                amenities=room_info["amenities"],
-                is_available=True,
-                status="clean"
-            )
-            db.add(room)
-        
+        # One executemany INSERT instead of a unit-of-work flush per room
+        db.execute(insert(Room), [
+            {
+                "room_number": room_number,
+                "room_type": room_type,
+                "price_per_night": ROOM_TYPES[room_type]["price"],
+                "capacity": ROOM_TYPES[room_type]["capacity"],
+                "floor": floor,
+                "amenities": list(ROOM_TYPES[room_type]["amenities"]),
+                "is_available": True,
+                "status": "clean"
+            }
+            for room_number, room_type, floor in room_configs
+        ])
         db.commit()
         logger.success(f"Created {len(room_configs)} rooms")
         
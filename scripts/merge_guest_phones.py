@@ -0,0 +1,101 @@
+"""
+Guest Phone Merge Script
+Merges guests that share a phone number so guests.phone can be made unique
+
+Databases created before uq_guests_phone may hold several guest records per
+phone. The app refuses to start on such a database; run this script first.
+Without --apply it only reports what would change.
+
+Usage: python scripts/merge_guest_phones.py [--apply]
+"""
+
+import sys
+sys.path.append('..')
+
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import func, select, update
+
+from database.database import SessionLocal
+from database.models import Guest, Booking
+from loguru import logger
+
+
+def find_duplicates(db) -> dict:
+    """Guests grouped by phone, oldest first, for phones used by more than one guest"""
+    shared = select(Guest.phone).group_by(Guest.phone).having(func.count() > 1)
+    guests = db.scalars(select(Guest).where(Guest.phone.in_(shared)).order_by(Guest.id))
+
+    groups = defaultdict(list)
+    for guest in guests:
+        groups[guest.phone].append(guest)
+    return groups
+
+
+def merge_group(db, kept: Guest, others: list) -> None:
+    """Move the others' bookings to the kept guest and fold their details into it"""
+    other_ids = [guest.id for guest in others]
+    db.execute(update(Booking).where(Booking.guest_id.in_(other_ids)).values(guest_id=kept.id))
+
+    email = kept.email or next((guest.email for guest in others if guest.email), None)
+    loyalty_points = sum(guest.loyalty_points or 0 for guest in [kept, *others])
+    is_vip = any(guest.is_vip for guest in [kept, *others])
+
+    # Delete first - the email being kept may belong to one of these rows (emails are unique)
+    for guest in others:
+        db.delete(guest)
+    db.flush()
+
+    kept.email = email
+    kept.loyalty_points = loyalty_points
+    kept.is_vip = is_vip
+
+
+def main():
+    """Report duplicate guest phones and merge them when --apply is given"""
+    parser = argparse.ArgumentParser(description="Merge guests that share a phone number")
+    parser.add_argument("--apply", action="store_true", help="write the merge (default: dry run)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        groups = find_duplicates(db)
+        if not groups:
+            logger.info("No phone number is shared by several guests - nothing to merge")
+            return
+
+        for phone, (kept, *others) in groups.items():
+            booking_counts = dict(db.execute(
+                select(Booking.guest_id, func.count())
+                .where(Booking.guest_id.in_([guest.id for guest in others]))
+                .group_by(Booking.guest_id)
+            ).all())
+            logger.info(f"{phone}: keeping guest {kept.id} ({kept.name}, {kept.email or 'no email'})")
+            for guest in others:
+                logger.info(
+                    f"  merging guest {guest.id} ({guest.name}, {guest.email or 'no email'}) "
+                    f"with {booking_counts.get(guest.id, 0)} booking(s)"
+                )
+
+            if args.apply:
+                merge_group(db, kept, others)
+
+        if not args.apply:
+            logger.warning(f"Dry run: {len(groups)} phone number(s) to merge. Re-run with --apply to write.")
+            return
+
+        db.commit()
+        logger.success(f"Merged guests for {len(groups)} phone number(s)")
+
+    except Exception as e:
+        logger.error(f"Merge failed, nothing was changed: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
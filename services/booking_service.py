@@ -3,25 +3,63 @@ Booking Service
 Handles all booking-related business logic
 """
 
-from typing import Optional, Dict
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, Optional, Dict, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 from loguru import logger
-import uuid
 
-from database.models import Booking, Guest, Room
-from config.settings import settings
+from database.models import ACTIVE_BOOKING, Booking, BookingCounter, Guest, Room
+from config.settings import ROOM_TYPES
+from utils.dates import parse_day
+
+# Tax charged on the room amount
+TAX_RATE = 0.12
+
+# SQLSTATE raised by PostgreSQL when ex_bookings_room_stay rejects overlapping stays
+EXCLUSION_VIOLATION = "23P01"
+
+
+def _stay_amounts(room_rate: float, nights: int) -> Tuple[float, float, float]:
+    """Total, tax and final amount for a stay (shared by create and modify)"""
+    total_amount = room_rate * nights
+    tax_amount = total_amount * TAX_RATE
+    return total_amount, tax_amount, total_amount + tax_amount
+
+
+def _insert_for(db: AsyncSession):
+    """INSERT construct with ON CONFLICT support for the session's dialect"""
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def _is_stay_overlap(error: IntegrityError) -> bool:
+    """True if the database refused a booking because the room is taken for those dates"""
+    return getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
 
 
 class BookingService:
-    """Service class for managing bookings"""
+    """
+    Service class for managing bookings
+    
+    `on_availability_change` is awaited after every committed create, cancel
+    or modify, so cached availability can be dropped as soon as it goes stale.
+    """
     
-    def __init__(self):
+    def __init__(self, on_availability_change: Optional[Callable[[], Awaitable[None]]] = None):
+        self.on_availability_change = on_availability_change
         logger.info("BookingService initialized")
     
-    def create_booking(
+    async def _availability_changed(self) -> None:
+        if self.on_availability_change is not None:
+            await self.on_availability_change()
+    
+    async def create_booking(
         self,
-        db: Session,
+        db: AsyncSession,
         guest_name: str,
         phone: str,
         check_in_date: str,
@@ -50,8 +88,8 @@ class BookingService:
         """
         try:
             # Parse dates
-            check_in = datetime.strptime(check_in_date, "%Y-%m-%d")
-            check_out = datetime.strptime(check_out_date, "%Y-%m-%d")
+            check_in = parse_day(check_in_date)
+            check_out = parse_day(check_out_date)
             
             # Calculate nights
             nights = (check_out - check_in).days
@@ -59,20 +97,17 @@ class BookingService:
             if nights <= 0:
                 raise ValueError("Check-out date must be after check-in date")
             
-            # Get or create guest
-            guest = db.query(Guest).filter(Guest.phone == phone).first()
-            
-            if not guest:
-                guest = Guest(
-                    name=guest_name,
-                    phone=phone,
-                    email=email
-                )
-                db.add(guest)
-                db.flush()
+            # Get or create guest in one statement; an existing guest is left as is
+            # (the no-op update only makes RETURNING yield its id)
+            guest_id = (await db.execute(
+                _insert_for(db)(Guest)
+                .values(name=guest_name, phone=phone, email=email)
+                .on_conflict_do_update(index_elements=[Guest.phone], set_={"phone": Guest.phone})
+                .returning(Guest.id)
+            )).scalar_one()
             
             # Find available room
-            available_room = self._find_available_room(
+            available_room = await self._find_available_room(
                 db, check_in, check_out, room_type
             )
             
@@ -80,37 +115,43 @@ class BookingService:
                 raise ValueError(f"No {room_type} rooms available for the selected dates")
             
             # Calculate pricing
-            room_info = settings.ROOM_TYPES[room_type]
+            room_info = ROOM_TYPES[room_type]
             room_rate = room_info["price"]
-            total_amount = room_rate * nights
-            tax_amount = total_amount * 0.12  # 12% tax
-            final_amount = total_amount + tax_amount
+            total_amount, tax_amount, final_amount = _stay_amounts(room_rate, nights)
             
             # Generate booking reference
-            booking_reference = self._generate_booking_reference()
-            
-            # Create booking
-            booking = Booking(
-                booking_reference=booking_reference,
-                guest_id=guest.id,
-                room_id=available_room.id,
-                check_in_date=check_in,
-                check_out_date=check_out,
-                number_of_guests=guest_count,
-                number_of_nights=nights,
-                room_rate=room_rate,
-                total_amount=total_amount,
-                tax_amount=tax_amount,
-                final_amount=final_amount,
-                status="confirmed",
-                payment_status="pending",
-                special_requests=special_requests,
-                source="ai_agent"
-            )
+            booking_reference = await self._generate_booking_reference(db)
             
-            db.add(booking)
-            db.commit()
-            db.refresh(booking)
+            # Create booking - RETURNING hands back the id, so nothing is re-read afterwards
+            try:
+                booking_id = (await db.execute(
+                    insert(Booking)
+                    .values(
+                        booking_reference=booking_reference,
+                        guest_id=guest_id,
+                        room_id=available_room.id,
+                        check_in_date=check_in,
+                        check_out_date=check_out,
+                        number_of_guests=guest_count,
+                        number_of_nights=nights,
+                        room_rate=room_rate,
+                        total_amount=total_amount,
+                        tax_amount=tax_amount,
+                        final_amount=final_amount,
+                        status="confirmed",
+                        payment_status="pending",
+                        special_requests=special_requests,
+                        source="ai_agent"
+                    )
+                    .returning(Booking.id)
+                )).scalar_one()
+            except IntegrityError as e:
+                # A concurrent booking took the room after our availability check
+                if _is_stay_overlap(e):
+                    raise ValueError(f"No {room_type} rooms available for the selected dates") from e
+                raise
+            await db.commit()
+            await self._availability_changed()
             
             logger.success(f"Booking created: {booking_reference}")
             
@@ -124,61 +165,74 @@ class BookingService:
                 "check_out_date": check_out_date,
                 "nights": nights,
                 "total_amount": final_amount,
-                "booking_id": booking.id
+                "booking_id": booking_id
             }
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Booking creation failed: {e}")
             raise
     
-    def _find_available_room(
+    async def _find_available_room(
         self,
-        db: Session,
+        db: AsyncSession,
         check_in: datetime,
         check_out: datetime,
         room_type: str
     ) -> Optional[Room]:
         """Find an available room of the specified type"""
+        # Any active booking overlapping [check_in, check_out) blocks the room
+        conflicting = select(Booking.id).where(
+            Booking.room_id == Room.id,
+            ACTIVE_BOOKING,
+            Booking.check_out_date > check_in,
+            Booking.check_in_date < check_out
+        )
         
-        # Get all rooms of the specified type
-        rooms = db.query(Room).filter(
-            Room.room_type == room_type,
-            Room.status == "clean",
-            Room.is_available == True
-        ).all()
+        # One anti-join query instead of a conflict lookup per room
+        result = await db.execute(
+            select(Room).where(
+                Room.room_type == room_type,
+                Room.status == "clean",
+                Room.is_available == True,
+                ~conflicting.exists()
+            ).order_by(Room.id).limit(1)
+        )
+        return result.scalars().first()
+    
+    async def _generate_booking_reference(self, db: AsyncSession) -> str:
+        """Generate unique booking reference from today's counter (same transaction as the booking)"""
+        today = date.today()
         
-        # Check each room for availability
-        for room in rooms:
-            # Check if room is booked during the requested dates
-            conflicting_bookings = db.query(Booking).filter(
-                Booking.room_id == room.id,
-                Booking.status.in_(["pending", "confirmed", "checked_in"]),
-                Booking.check_out_date > check_in,
-                Booking.check_in_date < check_out
-            ).first()
-            
-            if not conflicting_bookings:
-                return room
+        # Upsert: first booking of the day starts at 1, later ones bump the row atomically
+        statement = (
+            _insert_for(db)(BookingCounter)
+            .values(day=today, last=1)
+            .on_conflict_do_update(
+                index_elements=[BookingCounter.day],
+                set_={"last": BookingCounter.last + 1}
+            )
+            .returning(BookingCounter.last)
+        )
+        sequence = (await db.execute(statement)).scalar_one()
         
-        return None
+        return f"BK{today:%Y%m%d}-{sequence:04d}"
     
-    def _generate_booking_reference(self) -> str:
-        """Generate unique booking reference"""
-        timestamp = datetime.now().strftime("%y%m%d")
-        random_part = str(uuid.uuid4())[:4].upper()
-        return f"BK{timestamp}{random_part}"
-    
-    def cancel_booking(
+    async def cancel_booking(
         self,
-        db: Session,
+        db: AsyncSession,
         booking_reference: str
     ) -> Dict:
         """Cancel a booking"""
         try:
-            booking = db.query(Booking).filter(
-                Booking.booking_reference == booking_reference
-            ).first()
+            # Only the booking's own columns are used: skip the selectin loads of
+            # guest and room, and fail loudly if a relation is touched later
+            result = await db.execute(
+                select(Booking)
+                .where(Booking.booking_reference == booking_reference)
+                .options(raiseload("*"))
+            )
+            booking = result.scalars().first()
             
             if not booking:
                 raise ValueError("Booking not found")
@@ -187,7 +241,8 @@ class BookingService:
                 raise ValueError("Booking is already cancelled")
             
             booking.status = "cancelled"
-            db.commit()
+            await db.commit()
+            await self._availability_changed()
             
             logger.info(f"Booking cancelled: {booking_reference}")
             
@@ -198,22 +253,27 @@ class BookingService:
             }
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Cancellation failed: {e}")
             raise
     
-    def modify_booking(
+    async def modify_booking(
         self,
-        db: Session,
+        db: AsyncSession,
         booking_reference: str,
         new_check_in: Optional[str] = None,
         new_check_out: Optional[str] = None
     ) -> Dict:
         """Modify booking dates"""
         try:
-            booking = db.query(Booking).filter(
-                Booking.booking_reference == booking_reference
-            ).first()
+            # Only the booking's own columns are used: skip the selectin loads of
+            # guest and room, and fail loudly if a relation is touched later
+            result = await db.execute(
+                select(Booking)
+                .where(Booking.booking_reference == booking_reference)
+                .options(raiseload("*"))
+            )
+            booking = result.scalars().first()
             
             if not booking:
                 raise ValueError("Booking not found")
@@ -223,19 +283,25 @@ class BookingService:
             
             # Update dates if provided
             if new_check_in:
-                booking.check_in_date = datetime.strptime(new_check_in, "%Y-%m-%d")
+                booking.check_in_date = parse_day(new_check_in)
             
             if new_check_out:
-                booking.check_out_date = datetime.strptime(new_check_out, "%Y-%m-%d")
+                booking.check_out_date = parse_day(new_check_out)
             
             # Recalculate nights and pricing
             nights = (booking.check_out_date - booking.check_in_date).days
             booking.number_of_nights = nights
-            booking.total_amount = booking.room_rate * nights
-            booking.tax_amount = booking.total_amount * 0.12
-            booking.final_amount = booking.total_amount + booking.tax_amount
+            booking.total_amount, booking.tax_amount, booking.final_amount = _stay_amounts(
+                booking.room_rate, nights
+            )
             
-            db.commit()
+            try:
+                await db.commit()
+            except IntegrityError as e:
+                if _is_stay_overlap(e):
+                    raise ValueError("The room is already booked for the new dates") from e
+                raise
+            await self._availability_changed()
             
             logger.info(f"Booking modified: {booking_reference}")
             
@@ -248,6 +314,6 @@ class BookingService:
             }
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Modification failed: {e}")
             raise
@@ -4,12 +4,13 @@ Handles room inventory and availability management
 """
 
 from typing import List, Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from database.models import Room, Booking
-from config.settings import settings
+from database.models import ACTIVE_BOOKING, Room, Booking
+from config.settings import ROOM_TYPES
+from utils.dates import parse_day
 
 
 class RoomService:
@@ -18,9 +19,9 @@ class RoomService:
     def __init__(self):
         logger.info("RoomService initialized")
     
-    def check_availability(
+    async def check_availability(
         self,
-        db: Session,
+        db: AsyncSession,
         check_in_date: str,
         check_out_date: str,
         room_type: Optional[str] = None
@@ -38,34 +39,30 @@ class RoomService:
             List of available rooms
         """
         try:
-            check_in = datetime.strptime(check_in_date, "%Y-%m-%d")
-            check_out = datetime.strptime(check_out_date, "%Y-%m-%d")
+            check_in = parse_day(check_in_date)
+            check_out = parse_day(check_out_date)
             
-            # Build query
-            query = db.query(Room).filter(
+            # Any active booking overlapping [check_in, check_out) blocks the room
+            conflicting = select(Booking.id).where(
+                Booking.room_id == Room.id,
+                ACTIVE_BOOKING,
+                Booking.check_out_date > check_in,
+                Booking.check_in_date < check_out
+            )
+            
+            # Single query - the overlap test runs in the database per room
+            query = select(Room).where(
                 Room.is_available == True,
-                Room.status == "clean"
+                Room.status == "clean",
+                ~conflicting.exists()
             )
             
             if room_type:
-                query = query.filter(Room.room_type == room_type)
-            
-            all_rooms = query.all()
+                query = query.where(Room.room_type == room_type)
             
-            # Filter out rooms with conflicting bookings
-            available_rooms = []
-            for room in all_rooms:
-                conflicting = db.query(Booking).filter(
-                    Booking.room_id == room.id,
-                    Booking.status.in_(["pending", "confirmed", "checked_in"]),
-                    Booking.check_out_date > check_in,
-                    Booking.check_in_date < check_out
-                ).first()
-                
-                if not conflicting:
-                    available_rooms.append(room)
+            available_rooms = (await db.execute(query)).scalars().all()
             
-            logger.debug(f"Found {len(available_rooms)} available rooms")
+            logger.debug("Found {} available rooms", len(available_rooms))
             return available_rooms
             
         except Exception as e:
@@ -74,18 +71,18 @@ class RoomService:
     
     def get_room_info(self, room_type: str) -> dict:
         """Get information about a room type"""
-        if room_type not in settings.ROOM_TYPES:
+        if room_type not in ROOM_TYPES:
             raise ValueError(f"Unknown room type: {room_type}")
         
-        return settings.ROOM_TYPES[room_type]
+        return ROOM_TYPES[room_type]
     
     def get_all_room_types(self) -> dict:
         """Get information about all room types"""
-        return settings.ROOM_TYPES
+        return ROOM_TYPES
     
-    def create_room(
+    async def create_room(
         self,
-        db: Session,
+        db: AsyncSession,
         room_number: str,
         room_type: str,
         floor: int,
@@ -101,43 +98,43 @@ class RoomService:
                 price_per_night=room_info["price"],
                 capacity=capacity or room_info["capacity"],
                 floor=floor,
-                amenities=room_info["amenities"],
+                amenities=list(room_info["amenities"]),
                 is_available=True,
                 status="clean"
             )
             
             db.add(room)
-            db.commit()
-            db.refresh(room)
+            await db.commit()
+            await db.refresh(room)
             
             logger.success(f"Room created: {room_number}")
             return room
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Room creation failed: {e}")
             raise
     
-    def update_room_status(
+    async def update_room_status(
         self,
-        db: Session,
+        db: AsyncSession,
         room_id: int,
         status: str
     ) -> Room:
         """Update room status (clean, dirty, maintenance)"""
         try:
-            room = db.query(Room).filter(Room.id == room_id).first()
+            room = await db.get(Room, room_id)
             
             if not room:
                 raise ValueError("Room not found")
             
             room.status = status
-            db.commit()
+            await db.commit()
             
             logger.info(f"Room {room.room_number} status updated to {status}")
             return room
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Status update failed: {e}")
             raise
@@ -3,7 +3,7 @@ Voice Service
 Handles speech-to-text and text-to-speech processing
 """
 
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional
 import base64
 from io import BytesIO
 from loguru import logger
@@ -13,6 +13,16 @@ from pydub import AudioSegment
 
 from config.settings import settings
 
+# Languages spoken with their own gTTS voice; anything else falls back to English
+TTS_LANGUAGES = frozenset({"en", "hi", "ta", "te", "kn"})
+
+# Upload types sr.AudioFile decodes itself (FLAC is left out - it would
+# spawn the flac binary, no cheaper than ffmpeg)
+NATIVE_AUDIO_TYPES = frozenset({
+    "audio/wav", "audio/wave", "audio/x-wav", "audio/vnd.wave",
+    "audio/aiff", "audio/x-aiff"
+})
+
 
 class VoiceService:
     """Service class for voice processing"""
@@ -23,56 +33,69 @@ class VoiceService:
     
     def speech_to_text(
         self,
-        audio_base64: str,
-        language: str = "en-IN"
+        audio_file: BinaryIO,
+        language: str = "en-IN",
+        content_type: Optional[str] = None
     ) -> Optional[str]:
         """
         Convert speech to text
         
         Args:
-            audio_base64: Base64 encoded audio data
+            audio_file: File-like object with the raw audio bytes
             language: Language code for recognition
+            content_type: MIME type of the upload, if known; WAV and AIFF
+                are read directly instead of being transcoded by ffmpeg
         
         Returns:
             Transcribed text or None if failed
         """
         try:
-            # Decode base64 audio
-            audio_data = base64.b64decode(audio_base64)
-            
-            # Convert to AudioSegment
-            audio = AudioSegment.from_file(BytesIO(audio_data))
+            audio_data = None
+            mime_type = (content_type or "").partition(";")[0].strip().lower()
+            if mime_type in NATIVE_AUDIO_TYPES:
+                try:
+                    audio_data = self._record(audio_file)
+                except ValueError:
+                    # Mislabelled upload - fall back to the transcode below
+                    audio_file.seek(0)
             
-            # Export as WAV
-            wav_io = BytesIO()
-            audio.export(wav_io, format="wav")
-            wav_io.seek(0)
+            if audio_data is None:
+                audio_data = self._record(self._transcode_to_wav(audio_file))
             
-            # Recognize speech
-            with sr.AudioFile(wav_io) as source:
-                audio_data = self.recognizer.record(source)
+            try:
+                # Try Google Speech Recognition
+                text = self.recognizer.recognize_google(
+                    audio_data,
+                    language=language
+                )
+                logger.success("Transcribed: {}", text)
+                return text
                 
-                try:
-                    # Try Google Speech Recognition
-                    text = self.recognizer.recognize_google(
-                        audio_data,
-                        language=language
-                    )
-                    logger.success(f"Transcribed: {text}")
-                    return text
-                    
-                except sr.UnknownValueError:
-                    logger.warning("Could not understand audio")
-                    return None
-                    
-                except sr.RequestError as e:
-                    logger.error(f"Speech recognition error: {e}")
-                    return None
+            except sr.UnknownValueError:
+                logger.warning("Could not understand audio")
+                return None
+                
+            except sr.RequestError as e:
+                logger.error(f"Speech recognition error: {e}")
+                return None
                     
         except Exception as e:
             logger.error(f"Speech-to-text error: {e}")
             return None
     
+    def _record(self, audio_file: BinaryIO) -> sr.AudioData:
+        """Read a whole WAV/AIFF stream into recognizer audio"""
+        with sr.AudioFile(audio_file) as source:
+            return self.recognizer.record(source)
+    
+    @staticmethod
+    def _transcode_to_wav(audio_file: BinaryIO) -> BytesIO:
+        """Decode any ffmpeg-readable audio and re-encode it as WAV in memory"""
+        wav_io = BytesIO()
+        AudioSegment.from_file(audio_file).export(wav_io, format="wav")
+        wav_io.seek(0)
+        return wav_io
+    
     def text_to_speech(
         self,
         text: str,
@@ -89,16 +112,7 @@ class VoiceService:
             Base64 encoded audio data
         """
         try:
-            # Map language codes for gTTS
-            lang_map = {
-                "en": "en",
-                "hi": "hi",
-                "ta": "ta",
-                "te": "te",
-                "kn": "kn"
-            }
-            
-            gtts_lang = lang_map.get(language, "en")
+            gtts_lang = language if language in TTS_LANGUAGES else "en"
             
             # Generate speech
             tts = gTTS(text=text, lang=gtts_lang, slow=False)
@@ -118,6 +132,33 @@ class VoiceService:
             logger.error(f"Text-to-speech error: {e}")
             raise
     
+    def stream_tts(
+        self,
+        text: str,
+        language: str = "en"
+    ) -> Iterator[bytes]:
+        """
+        Convert text to speech, yielding MP3 audio as it is synthesized
+        
+        gTTS synthesizes long text in parts; each part is yielded as soon
+        as it arrives so playback can start before the whole reply is ready.
+        
+        Args:
+            text: Text to convert
+            language: Language code
+        
+        Yields:
+            MP3 audio chunks
+        """
+        gtts_lang = language if language in TTS_LANGUAGES else "en"
+        
+        try:
+            for chunk in gTTS(text=text, lang=gtts_lang, slow=False).stream():
+                yield chunk
+        except Exception as e:
+            logger.error(f"Text-to-speech stream error: {e}")
+            raise
+    
     def process_audio_file(
         self,
         file_path: str,
@@ -0,0 +1,130 @@
+"""
+Unit Tests for MicroBatcher
+Run with: pytest tests/test_batching.py
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+sys.path.append('..')
+
+from utils.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Test cases for MicroBatcher"""
+
+    def test_results_map_back_to_submitters(self):
+        """Test that every caller gets the result for its own item"""
+        batches = []
+
+        def double(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        async def run():
+            batcher = MicroBatcher(double, max_batch=16, max_wait_ms=20)
+            try:
+                return await asyncio.gather(*(batcher.submit(n) for n in range(10)))
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(run()) == [n * 2 for n in range(10)]
+        # Concurrent submissions were processed together rather than one by one
+        assert len(batches) < 10
+        assert sorted(item for batch in batches for item in batch) == list(range(10))
+
+    def test_batches_respect_max_batch(self):
+        """Test that no call receives more than max_batch items"""
+        sizes = []
+
+        def identity(items):
+            sizes.append(len(items))
+            return list(items)
+
+        async def run():
+            batcher = MicroBatcher(identity, max_batch=3, max_wait_ms=20)
+            try:
+                return await asyncio.gather(*(batcher.submit(n) for n in range(10)))
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(run()) == list(range(10))
+        assert max(sizes) <= 3
+        assert sum(sizes) == 10
+
+    def test_exception_fails_the_whole_batch(self):
+        """Test that an error in the batch function reaches every caller in that batch"""
+        def fail(items):
+            raise ValueError("boom")
+
+        async def run():
+            batcher = MicroBatcher(fail, max_batch=8, max_wait_ms=20)
+            try:
+                return await asyncio.gather(
+                    *(batcher.submit(n) for n in range(3)), return_exceptions=True
+                )
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(run())
+        assert len(results) == 3
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_keeps_working_after_a_failed_batch(self):
+        """Test that the worker survives an exception and serves later items"""
+        def fail_on_negative(items):
+            if any(item < 0 for item in items):
+                raise ValueError("negative")
+            return list(items)
+
+        async def run():
+            batcher = MicroBatcher(fail_on_negative, max_batch=8, max_wait_ms=1)
+            try:
+                with pytest.raises(ValueError):
+                    await batcher.submit(-1)
+                return await batcher.submit(5)
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(run()) == 5
+
+    def test_lone_item_is_not_held_back(self):
+        """Test that a single submission is processed without waiting out max_wait"""
+        async def run():
+            batcher = MicroBatcher(list, max_batch=16, max_wait_ms=5000)
+            try:
+                started = time.monotonic()
+                result = await batcher.submit("only")
+                return result, time.monotonic() - started
+            finally:
+                await batcher.stop()
+
+        result, elapsed = asyncio.run(run())
+        assert result == "only"
+        assert elapsed < 1
+
+    def test_stop_fails_batch_in_flight(self):
+        """Test that stopping mid-batch resolves the futures of that batch"""
+        release = threading.Event()
+
+        def slow(items):
+            release.wait(5)
+            return list(items)
+
+        async def run():
+            batcher = MicroBatcher(slow, max_batch=8, max_wait_ms=1)
+            pending = asyncio.ensure_future(batcher.submit(1))
+            await asyncio.sleep(0.05)
+            await batcher.stop()
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(pending, 1)
+
+        asyncio.run(run())
+
+    def test_stop_without_submissions(self):
+        """Test that stopping an unused batcher is a no-op"""
+        asyncio.run(MicroBatcher(list).stop())
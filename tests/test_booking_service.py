@@ -0,0 +1,107 @@
+"""
+Unit Tests for Booking Service
+Run with: pytest tests/test_booking_service.py
+"""
+
+import asyncio
+from datetime import date, timedelta
+import pytest
+import sys
+sys.path.append('..')
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base, BookingCounter, Guest, Room
+from services.booking_service import BookingService
+
+
+async def _run_with_db(scenario):
+    """Run scenario(db, service) against a fresh in-memory database with two suites"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(insert(Room), [
+                {"room_number": number, "room_type": "suite", "price_per_night": 5500,
+                 "capacity": 4, "floor": 4, "is_available": True, "status": "clean"}
+                for number in ("401", "402")
+            ])
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            return await scenario(db, BookingService())
+    finally:
+        await engine.dispose()
+
+
+def _book(service, db, phone, check_in, nights=2):
+    return service.create_booking(
+        db,
+        guest_name="Test Guest",
+        phone=phone,
+        check_in_date=check_in.isoformat(),
+        check_out_date=(check_in + timedelta(days=nights)).isoformat(),
+        room_type="suite",
+        guest_count=2
+    )
+
+
+class TestBookingReferences:
+    """Booking references come from a per-day counter: BKYYYYMMDD-NNNN"""
+
+    def test_references_count_up_within_a_day(self):
+        """Test that consecutive bookings get consecutive sequence numbers"""
+        stay = date.today() + timedelta(days=30)
+
+        async def scenario(db, service):
+            first = await _book(service, db, "+911111111111", stay)
+            second = await _book(service, db, "+912222222222", stay + timedelta(days=5))
+            return first, second
+
+        first, second = asyncio.run(_run_with_db(scenario))
+        prefix = f"BK{date.today():%Y%m%d}-"
+        assert first["booking_reference"] == prefix + "0001"
+        assert second["booking_reference"] == prefix + "0002"
+        assert first["booking_id"] != second["booking_id"]
+
+    def test_counter_starts_fresh_each_day(self):
+        """Test that an earlier day's counter does not carry over"""
+        stay = date.today() + timedelta(days=30)
+
+        async def scenario(db, service):
+            db.add(BookingCounter(day=date.today() - timedelta(days=1), last=41))
+            await db.commit()
+            booking = await _book(service, db, "+911111111111", stay)
+            counters = dict((await db.execute(select(BookingCounter.day, BookingCounter.last))).all())
+            return booking, counters
+
+        booking, counters = asyncio.run(_run_with_db(scenario))
+        assert booking["booking_reference"] == f"BK{date.today():%Y%m%d}-0001"
+        assert counters == {date.today() - timedelta(days=1): 41, date.today(): 1}
+
+    def test_failed_booking_does_not_use_a_number(self):
+        """Test that a booking rejected for lack of rooms leaves the sequence untouched"""
+        stay = date.today() + timedelta(days=30)
+
+        async def scenario(db, service):
+            await _book(service, db, "+911111111111", stay)
+            await _book(service, db, "+912222222222", stay)
+            with pytest.raises(ValueError):
+                await _book(service, db, "+913333333333", stay)
+            return await _book(service, db, "+913333333333", stay + timedelta(days=5))
+
+        booking = asyncio.run(_run_with_db(scenario))
+        assert booking["booking_reference"] == f"BK{date.today():%Y%m%d}-0003"
+
+    def test_returning_guest_reuses_record(self):
+        """Test that bookings with the same phone share one guest row"""
+        stay = date.today() + timedelta(days=30)
+
+        async def scenario(db, service):
+            await _book(service, db, "+911111111111", stay)
+            await _book(service, db, "+911111111111", stay + timedelta(days=5))
+            return (await db.execute(select(func.count()).select_from(Guest))).scalar_one()
+
+        assert asyncio.run(_run_with_db(scenario)) == 1
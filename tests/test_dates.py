@@ -0,0 +1,61 @@
+"""
+Unit Tests for Date Parsing
+Run with: pytest tests/test_dates.py
+"""
+
+from datetime import datetime
+import pytest
+import sys
+sys.path.append('..')
+
+from utils.dates import parse_day
+
+
+def _strptime(value):
+    """Reference behaviour: the value, or ValueError"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return ValueError
+
+
+def _parse_day(value):
+    try:
+        return parse_day(value)
+    except ValueError:
+        return ValueError
+
+
+class TestParseDay:
+    """parse_day must accept and reject exactly what strptime("%Y-%m-%d") does"""
+
+    @pytest.mark.parametrize("value", [
+        "2026-10-15",
+        "2024-02-29",
+        "0001-01-01",
+        "9999-12-31",
+        # strptime-only forms handled by the fallback
+        "2026-1-5",
+        "2026-01-5",
+        "२०२६-१०-१५",
+        # Invalid dates
+        "2023-02-29",
+        "2026-13-01",
+        "2026-00-10",
+        "2026-10-32",
+        "0000-01-01",
+        # Shapes fromisoformat would accept but strptime does not
+        "2026-W01-1",
+        "20261015",
+        "2026-10-15T10:00",
+        "2026-10-15 ",
+        "",
+        "not a date",
+    ])
+    def test_matches_strptime(self, value):
+        """Test that results and failures agree with strptime"""
+        assert _parse_day(value) == _strptime(value)
+
+    def test_returns_midnight_datetime(self):
+        """Test that the fast path returns a naive datetime at midnight"""
+        assert parse_day("2026-10-15") == datetime(2026, 10, 15)
@@ -0,0 +1,43 @@
+"""
+Unit Tests for Entity Extractor
+Run with: pytest tests/test_entity_extractor.py
+"""
+
+from datetime import date, timedelta
+import pytest
+import sys
+sys.path.append('..')
+
+from models.entity_extractor import EntityExtractor
+
+
+class TestTemporalExpressions:
+    """The earliest expression in the message wins; at one position the longest does"""
+
+    @pytest.fixture(scope="module")
+    def extractor(self):
+        """Create one extractor for all tests"""
+        return EntityExtractor()
+
+    @pytest.mark.parametrize("text, days_ahead", [
+        ("Book it for today", 0),
+        ("Arriving tomorrow", 1),
+        ("Arriving the day after tomorrow", 2),
+        ("Sometime next week", 7),
+        # "tomorrow" inside "day after tomorrow" is not a separate mention
+        ("Day after tomorrow please", 2),
+        # Several expressions: the first one mentioned is used
+        ("Tomorrow or day after tomorrow", 1),
+        ("Day after tomorrow or tomorrow", 2),
+        ("Next week, not today", 7),
+        ("Today or next month", 0),
+    ])
+    def test_precedence(self, extractor, text, days_ahead):
+        """Test which expression a message resolves to"""
+        expected = (date.today() + timedelta(days=days_ahead)).isoformat()
+
+        assert extractor._extract_date(text, text.lower()) == expected
+
+    def test_no_expression(self, extractor):
+        """Test that text without a date yields nothing"""
+        assert extractor._extract_date("A double room please", "a double room please") is None
@@ -0,0 +1,45 @@
+"""
+Unit Tests for Intent Classifier
+Run with: pytest tests/test_intent_classifier.py
+"""
+
+import pytest
+import sys
+sys.path.append('..')
+
+from models.intent_classifier import IntentClassifier
+
+
+class TestClassifyMany:
+    """classify_many must agree with classify on every message"""
+
+    @pytest.fixture(scope="module")
+    def classifier(self):
+        """Rule-based classifier - the AI fallback is switched off so results are deterministic"""
+        classifier = IntentClassifier()
+        classifier.use_ai = False
+        return classifier
+
+    @pytest.mark.parametrize("texts", [
+        [],
+        [""],
+        ["", ""],
+        ["Hello"],
+        ["I want to book a room", "What is the price?", "Hello there"],
+        ["hello", "", "book a room", ""],
+        # Neighbouring messages must not combine into a match across the separator
+        ["I want to book", "a room", "good", "morning"],
+        ["check", "in tomorrow", "stay"],
+        ["नमस्ते", "வணக்கம்", "कमरा बुकिंग"],
+        ["Something unrelated", "HELLO", "Room types and rates?", "thanks, bye"],
+        ["hi hello hey", "reserve accommodation", "xyz" * 50],
+    ])
+    def test_matches_per_text_classify(self, classifier, texts):
+        """Test that batching gives the same result as classifying each text"""
+        assert classifier.classify_many(texts) == [classifier.classify(text) for text in texts]
+
+    def test_first_intent_wins_per_message(self, classifier):
+        """Test that a message matching several intents keeps the highest-priority one"""
+        text = "Hello, I want to book a room"
+
+        assert classifier.classify_many([text, text]) == [classifier.classify(text)] * 2
@@ -0,0 +1,99 @@
+"""
+Unit Tests for SingleFlight
+Run with: pytest tests/test_singleflight.py
+"""
+
+import asyncio
+import pytest
+import sys
+sys.path.append('..')
+
+from utils.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers with the same key wait on a single computation"""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["result"] * 5
+        assert len(calls) == 1
+
+    def test_different_keys_run_separately(self):
+        """Test that each key gets its own computation"""
+        async def run():
+            flight = SingleFlight()
+
+            async def compute(key):
+                await asyncio.sleep(0.01)
+                return key
+
+            return await asyncio.gather(
+                flight.do("a", lambda: compute("a")),
+                flight.do("b", lambda: compute("b"))
+            )
+
+        assert asyncio.run(run()) == ["a", "b"]
+
+    def test_key_is_forgotten_after_completion(self):
+        """Test that results are not cached once the call has finished"""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            flight = SingleFlight()
+            first = await flight.do("key", compute)
+            second = await flight.do("key", compute)
+            return first, second, flight._calls
+
+        first, second, pending = asyncio.run(run())
+        assert (first, second) == (1, 2)
+        assert pending == {}
+
+    def test_exception_reaches_every_caller(self):
+        """Test that a failed computation raises in all waiting callers"""
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(
+                flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert len(results) == 2
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one waiter leaves the shared work running"""
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def run():
+            flight = SingleFlight()
+            first = asyncio.ensure_future(flight.do("key", compute))
+            second = asyncio.ensure_future(flight.do("key", compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == "done"
@@ -1,3 +1,12 @@
 """Utilities module"""
 
-__all__ = []
+from .cache import ResponseCache
+from .batching import MicroBatcher
+from .log_config import setup_logging
+from .ids import new_id
+from .singleflight import SingleFlight
+from .cached_page import CachedPage
+from .compression import SelectiveGZipMiddleware
+from .dates import parse_day
+
+__all__ = ["ResponseCache", "MicroBatcher", "setup_logging", "new_id", "SingleFlight", "CachedPage", "SelectiveGZipMiddleware", "parse_day"]
@@ -0,0 +1,97 @@
+"""
+Micro-batching
+Coalesces concurrent requests into one call of a batch function
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import contextlib
+
+
+class MicroBatcher:
+    """
+    Processes concurrently submitted items together
+
+    A batch is flushed as soon as nothing else is pending, so a lone item is
+    never held back; under load, items queued while the previous batch ran are
+    taken together (up to `max_batch`, collected for at most `max_wait_ms`).
+
+    `fn` receives a list of items and must return a list of results in the
+    same order. It runs in a worker thread so the event loop stays free.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 16,
+        max_wait_ms: int = 15
+    ):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Items taken off the queue and not yet answered
+        self._batch: List[Tuple[Any, asyncio.Future]] = []
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def stop(self) -> None:
+        """Cancel the worker and fail anything still queued or in flight"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        self._worker = None
+
+        pending = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.cancel()
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        self._batch = batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch and loop.time() < deadline:
+            if self._queue.empty():
+                # Let submitters that are already runnable enqueue; flush if none did
+                await asyncio.sleep(0)
+                if self._queue.empty():
+                    break
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                results = await asyncio.to_thread(self.fn, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            # Left in place if the worker is cancelled mid-batch, so stop() can fail them
+            self._batch = []
@@ -0,0 +1,112 @@
+"""
+Response Cache
+Small async key/value cache shared by the API endpoints
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import time
+import msgpack
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from loguru import logger
+
+
+class ResponseCache:
+    """
+    TTL cache for JSON-like values
+
+    Uses Redis when a URL is configured so every worker shares the same
+    entries, otherwise falls back to a bounded in-process dictionary.
+    With Redis, `local_ttl` additionally keeps hot entries in process for
+    up to that many seconds in front of Redis. delete() and clear() only
+    reach the local layer of the calling process, so use it only for
+    entries that are never invalidated early.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        namespace: str = "cache",
+        max_entries: int = 1024,
+        local_ttl: Optional[int] = None
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        self._redis = aioredis.Redis.from_url(redis_url, decode_responses=False) if redis_url else None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._local.pop(key, None)
+            return None
+        return value
+
+    def _set_local(self, key: str, value: Any, ttl: int) -> None:
+        if key not in self._local and len(self._local) >= self.max_entries:
+            # Dicts keep insertion order - drop the oldest entry
+            self._local.pop(next(iter(self._local)))
+        self._local[key] = (time.monotonic() + ttl, value)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry"""
+        value = self._get_local(key)
+        if value is not None or self._redis is None:
+            return value
+
+        try:
+            raw = await self._redis.get(self._key(key))
+        except RedisError as e:
+            logger.warning(f"Cache read failed ({self.namespace}): {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = msgpack.unpackb(raw, raw=False)
+        if self.local_ttl:
+            self._set_local(key, value, self.local_ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """Store a value for ttl seconds"""
+        if self._redis is None:
+            self._set_local(key, value, ttl)
+            return
+
+        if self.local_ttl:
+            self._set_local(key, value, min(ttl, self.local_ttl))
+        try:
+            await self._redis.set(self._key(key), msgpack.packb(value, use_bin_type=True), ex=ttl)
+        except RedisError as e:
+            logger.warning(f"Cache write failed ({self.namespace}): {e}")
+
+    async def delete(self, key: str) -> None:
+        """Remove a single entry"""
+        self._local.pop(key, None)
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.delete(self._key(key))
+        except RedisError as e:
+            logger.warning(f"Cache delete failed ({self.namespace}): {e}")
+
+    async def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        self._local.clear()
+        if self._redis is None:
+            return
+
+        try:
+            keys = [key async for key in self._redis.scan_iter(match=f"{self.namespace}:*")]
+            if keys:
+                await self._redis.delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Cache clear failed ({self.namespace}): {e}")
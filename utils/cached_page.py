@@ -0,0 +1,61 @@
+"""
+Cached HTML Pages
+Static pages encoded, compressed and hashed once, then served with ETag/304 support
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import gzip
+import hashlib
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """Static HTML page read, compressed and hashed once at import"""
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+    CACHE_CONTROL = "public, max-age=86400"
+    MEDIA_TYPE = "text/html; charset=utf-8"
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> "CachedPage":
+        return cls(
+            body=body,
+            # Compressed once, so the slowest (smallest) level costs nothing per request
+            gzip_body=gzip.compress(body, compresslevel=9),
+            etag=f'"{hashlib.sha1(body).hexdigest()}"'
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CachedPage":
+        return cls.from_bytes(path.read_bytes())
+
+    def respond(self, request: Request) -> Response:
+        """Serve the prebuilt payload, honouring If-None-Match and gzip"""
+        headers = {
+            "Cache-Control": self.CACHE_CONTROL,
+            "ETag": self.etag,
+            "Vary": "Accept-Encoding"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._etag_matches(if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=self.MEDIA_TYPE, headers=headers)
+
+        return Response(content=self.body, media_type=self.MEDIA_TYPE, headers=headers)
+
+    def _etag_matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        return self.etag in candidates
@@ -0,0 +1,29 @@
+"""
+Response Compression
+GZipMiddleware that leaves selected (streaming) routes uncompressed
+"""
+
+from typing import Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware:
+    """
+    Gzip responses except for requests to `exclude_paths`
+
+    GZipMiddleware buffers the body until it has enough to compress, which
+    holds back server-sent events and streamed audio; those routes bypass it.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = (), **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
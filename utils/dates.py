@@ -0,0 +1,21 @@
+"""
+Date Parsing
+Fast parsing of the YYYY-MM-DD dates used throughout the booking API
+"""
+
+from datetime import datetime
+
+
+def parse_day(value: str) -> datetime:
+    """
+    Parse a YYYY-MM-DD date to midnight, like datetime.strptime(value, "%Y-%m-%d")
+
+    Zero-padded ASCII dates (what the UIs and the entity extractor send) take
+    the C fromisoformat path; anything else goes through strptime, so the set
+    of accepted inputs stays the same. Invalid input still raises ValueError,
+    but the message may differ from strptime's (e.g. "month must be in 1..12").
+    """
+    if (len(value) == 10 and value.isascii() and value[4] == value[7] == "-"
+            and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()):
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d")
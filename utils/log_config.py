@@ -0,0 +1,33 @@
+"""
+Logging Configuration
+Routes loguru output through background queues so request handlers never block on log I/O
+"""
+
+import sys
+from loguru import logger
+
+from config.settings import settings
+
+
+def setup_logging() -> None:
+    """Replace loguru's default stderr sink with queued stdout and file sinks"""
+    logger.remove()
+
+    logger.add(
+        sys.stdout,
+        level=settings.LOG_LEVEL,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
+    )
+
+    if settings.LOG_FILE:
+        logger.add(
+            settings.LOG_FILE,
+            level=settings.LOG_LEVEL,
+            rotation="100 MB",
+            retention=5,
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
+        )
@@ -0,0 +1,36 @@
+"""
+Request Coalescing
+Concurrent callers asking for the same key share one in-flight computation
+"""
+
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time
+
+    Callers that arrive while a computation for their key is running await
+    the same task instead of starting their own. The key is forgotten once
+    the task finishes, so results are not cached here.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        # A cancelled caller must not cancel the work other callers wait on
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]